@@ -0,0 +1,4 @@
+"""Benchmarks of yougan against an in-process fake lavalink server.
+
+Run the whole suite with `python -m benchmarks`.
+"""
@@ -0,0 +1,66 @@
+"""Compare decoding a track locally against the `/decodetrack` round-trip.
+
+The HTTP path is measured against `benchmarks.fakes.FakeLavalink` answering with a
+canned payload, so the numbers are a lower bound for a real lavalink node.
+
+Usage: python -m benchmarks.decode_track [iterations]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+import aiohttp
+
+from yougan import decoder
+from yougan.node import Node
+
+from benchmarks.fakes import TRACK_ID
+from benchmarks.fakes import FakeLavalink
+
+
+def bench_local(iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decoder.decode_track(TRACK_ID)
+    return time.perf_counter() - start
+
+
+async def bench_http(iterations: int) -> float:
+    lavalink = FakeLavalink()
+    port = await lavalink.start()
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            node = Node(
+                name="bench",
+                host="127.0.0.1",
+                port=port,
+                password="",
+                app=None,  # type: ignore[arg-type]
+                session=session,
+            )
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await node._decode_track(TRACK_ID)
+            return time.perf_counter() - start
+    finally:
+        await lavalink.stop()
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    local = bench_local(iterations)
+    http = asyncio.run(bench_http(iterations))
+
+    print(f"iterations: {iterations}")
+    print(f"local decode: {local / iterations * 1e6:10.2f} us/track")
+    print(f"/decodetrack: {http / iterations * 1e6:10.2f} us/track")
+    print(f"speedup:      {http / local:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""In-process stand-ins for a lavalink node and the hikari bot."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import typing
+
+from aiohttp import web
+from hikari import snowflakes
+
+TRACK_ID = (
+    "QAAAjQIAJVJpY2sgQXN0bGV5IC0gTmV2ZXIgR29ubmEgR2l2ZSBZb3UgVXAADlJpY2tBc3RsZXlWRVZPAAAAAAADPCAAC2RRdzR3OVdnWGNR"
+    "AAEAK2h0dHBzOi8vd3d3LnlvdXR1YmUuY29tL3dhdGNoP3Y9ZFF3NHc5V2dYY1EAB3lvdXR1YmUAAAAAAAAAAA=="
+)
+TRACK_INFO = {
+    "identifier": "dQw4w9WgXcQ",
+    "isSeekable": True,
+    "author": "RickAstleyVEVO",
+    "length": 212000,
+    "isStream": False,
+    "position": 0,
+    "title": "Rick Astley - Never Gonna Give You Up",
+    "uri": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "sourceName": "youtube",
+}
+
+
+class FakeLavalink:
+    """A lavalink node serving the websocket, `/loadtracks`, `/decodetrack` and `/decodetracks`.
+
+    Parameters
+    ----------
+    latency: builtins.float
+        Seconds every REST request is delayed by.
+    search_results: builtins.int
+        Tracks returned for every search.
+    player_update_interval: typing.Optional[builtins.float]
+        If set, a `playerUpdate` is sent for every guild that sent a voice
+        update once per interval, spread evenly over it.
+    echo_events: builtins.bool
+        Answer `play` ops with a `TrackStartEvent` and `stop` ops with a `TrackEndEvent`.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        search_results: int = 10,
+        player_update_interval: typing.Optional[float] = None,
+        echo_events: bool = False,
+    ) -> None:
+        self.latency = latency
+        self.search_results = search_results
+        self.player_update_interval = player_update_interval
+        self.echo_events = echo_events
+        self.received: typing.List[str] = []
+        self.sockets: typing.List[web.WebSocketResponse] = []
+        self.guilds: typing.Dict[str, typing.Optional[str]] = {}
+        """Guilds which sent a voice update, with the track they are playing."""
+        self.frames_sent = 0
+        self.port = 0
+        self._runner: typing.Optional[web.AppRunner] = None
+        self._flood: typing.Optional[asyncio.Task[None]] = None
+
+    async def start(self) -> int:
+        app = web.Application()
+        app.router.add_get("/", self._websocket)
+        app.router.add_get("/loadtracks", self._loadtracks)
+        app.router.add_get("/decodetrack", self._decodetrack)
+        app.router.add_post("/decodetracks", self._decodetracks)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        if self.player_update_interval:
+            self._flood = asyncio.get_running_loop().create_task(self._flood_player_updates())
+        return self.port
+
+    async def stop(self) -> None:
+        if self._flood:
+            self._flood.cancel()
+        for socket in list(self.sockets):
+            await socket.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def send(self, frames: typing.Iterable[str]) -> None:
+        """Send raw frames to every connected client."""
+        for frame in frames:
+            for socket in self.sockets:
+                await socket.send_str(frame)
+                self.frames_sent += 1
+
+    async def _flood_player_updates(self) -> None:
+        assert self.player_update_interval
+        tick = 0.1
+        guilds = itertools.cycle([None])
+        known = 0
+        while True:
+            await asyncio.sleep(tick)
+            if len(self.guilds) != known:
+                known = len(self.guilds)
+                guilds = itertools.cycle(list(self.guilds))
+            if not known:
+                continue
+
+            now = int(asyncio.get_running_loop().time() * 1000)
+            count = max(1, round(known * tick / self.player_update_interval))
+            await self.send(
+                json.dumps(
+                    {"op": "playerUpdate", "guildId": guild_id, "state": {"time": now, "position": now % 212000}}
+                )
+                for guild_id in itertools.islice(guilds, count)
+            )
+
+    async def _answer(self, payload: typing.Dict[str, typing.Any]) -> None:
+        guild_id = payload.get("guildId")
+        if guild_id is None:
+            return
+        if payload["op"] == "voiceUpdate":
+            self.guilds.setdefault(guild_id, None)
+            return
+        if not self.echo_events or guild_id not in self.guilds:
+            return
+
+        frames = []
+        current = self.guilds[guild_id]
+        if payload["op"] == "play":
+            if current:
+                frames.append(
+                    {
+                        "op": "event",
+                        "type": "TrackEndEvent",
+                        "guildId": guild_id,
+                        "track": current,
+                        "reason": "REPLACED",
+                    }
+                )
+            frames.append({"op": "event", "type": "TrackStartEvent", "guildId": guild_id, "track": payload["track"]})
+            self.guilds[guild_id] = payload["track"]
+        elif payload["op"] == "stop" and current:
+            frames.append(
+                {"op": "event", "type": "TrackEndEvent", "guildId": guild_id, "track": current, "reason": "STOPPED"}
+            )
+            self.guilds[guild_id] = None
+        elif payload["op"] == "destroy":
+            self.guilds.pop(guild_id, None)
+
+        await self.send(json.dumps(frame) for frame in frames)
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+        self.sockets.append(socket)
+        try:
+            async for message in socket:
+                self.received.append(message.data)
+                if self.echo_events or self.player_update_interval:
+                    await self._answer(json.loads(message.data))
+        finally:
+            self.sockets.remove(socket)
+        return socket
+
+    async def _delay(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _loadtracks(self, request: web.Request) -> web.Response:
+        await self._delay()
+        identifier = request.query["identifier"]
+        tracks = [
+            {"track": TRACK_ID, "info": {**TRACK_INFO, "title": f"{identifier} {index}"}}
+            for index in range(self.search_results)
+        ]
+        return web.json_response({"loadType": "SEARCH_RESULT", "playlistInfo": {}, "tracks": tracks, "exception": None})
+
+    async def _decodetrack(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response(TRACK_INFO)
+
+    async def _decodetracks(self, request: web.Request) -> web.Response:
+        await self._delay()
+        track_ids = await request.json()
+        return web.json_response([{"track": track_id, "info": TRACK_INFO} for track_id in track_ids])
+
+
+class _User:
+    id = snowflakes.Snowflake(1)
+
+
+class _EventManager:
+    def subscribe(self, event_type: typing.Any, callback: typing.Any) -> None:
+        pass
+
+
+class FakeVoice:
+    """Joins voice channels instantly, without a gateway."""
+
+    def __init__(self, *, endpoint: str = "rotterdam1234.discord.media:443") -> None:
+        self.endpoint = endpoint
+
+    async def connect_to(
+        self,
+        guild: typing.Any,
+        channel: typing.Any,
+        voice_connection_type: typing.Any,
+        *,
+        deaf: bool = False,
+        mute: bool = False,
+        **kwargs: typing.Any,
+    ) -> typing.Any:
+        async def on_close(_: typing.Any) -> None:
+            pass
+
+        return await voice_connection_type.initialize(
+            channel_id=snowflakes.Snowflake(int(channel)),
+            endpoint=self.endpoint,
+            guild_id=snowflakes.Snowflake(int(guild)),
+            on_close=on_close,
+            owner=self,
+            session_id=f"session-{int(guild)}",
+            shard_id=0,
+            token=f"token-{int(guild)}",
+            user_id=_User.id,
+            **kwargs,
+        )
+
+
+class FakeApp:
+    """The parts of `hikari.GatewayBot` used by yougan."""
+
+    shard_count = 1
+
+    def __init__(self) -> None:
+        self.voice = FakeVoice()
+        self.event_manager = _EventManager()
+        self.dispatched = 0
+
+    def get_me(self) -> _User:
+        return _User()
+
+    def dispatch(self, event: typing.Any, *, return_tasks: bool = False) -> typing.Optional[asyncio.Future[typing.Any]]:
+        # Like hikari, nothing is returned unless the listener tasks are asked for.
+        self.dispatched += 1
+        return asyncio.gather() if return_tasks else None
@@ -0,0 +1,63 @@
+"""Measure websocket frames parsed and serialized per second with each available JSON codec.
+
+Usage: python -m benchmarks.json_codec [frames]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import typing
+
+from yougan import codec
+
+PLAYER_UPDATE = (
+    '{"op":"playerUpdate","guildId":"817327181659111454","state":{"time":1500467109,"position":60000,"connected":true}}'
+)
+STATS = (
+    '{"op":"stats","players":1024,"playingPlayers":812,"uptime":123456789,'
+    '"memory":{"free":123456789,"used":123456789,"allocated":123456789,"reservable":123456789},'
+    '"cpu":{"cores":8,"systemLoad":0.51,"lavalinkLoad":0.43},'
+    '"frameStats":{"sent":6000,"nulled":10,"deficit":-3010}}'
+)
+PLAY = {"op": "play", "guildId": "817327181659111454", "track": "QAAAjQIAJVJpY2sgQXN0bGV5", "noReplace": True}
+
+
+def _codecs() -> typing.Iterator[codec.JSONCodec]:
+    for cls in (codec.StdlibCodec, codec.UjsonCodec, codec.OrjsonCodec):
+        try:
+            yield cls()
+        except RuntimeError:
+            continue
+
+
+def bench_loads(json_codec: codec.JSONCodec, frames: int) -> float:
+    # Nine player updates for every stats frame, roughly what a busy node sends.
+    batch = [PLAYER_UPDATE] * 9 + [STATS]
+    loads = json_codec.loads
+    start = time.perf_counter()
+    for _ in range(frames // len(batch)):
+        for frame in batch:
+            loads(frame)
+    return frames / (time.perf_counter() - start)
+
+
+def bench_dumps(json_codec: codec.JSONCodec, frames: int) -> float:
+    dumps = json_codec.dumps
+    start = time.perf_counter()
+    for _ in range(frames):
+        dumps(PLAY)
+    return frames / (time.perf_counter() - start)
+
+
+def main() -> None:
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    print(f"default codec: {codec.default_codec().name}")
+    print(f"{'codec':<8}{'loads frames/s':>18}{'dumps frames/s':>18}")
+    for json_codec in _codecs():
+        print(f"{json_codec.name:<8}{bench_loads(json_codec, frames):>18,.0f}{bench_dumps(json_codec, frames):>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
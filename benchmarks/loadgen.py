@@ -0,0 +1,218 @@
+"""Synthetic load of many guilds playing music at once.
+
+Spins up fake lavalink nodes in a separate process, so the CPU measured is
+only the bot side, connects the requested players across them and drives
+play/pause/seek/skip actions at realistic rates while the nodes flood the
+client with `playerUpdate` frames.
+
+Usage: python -m benchmarks.loadgen --players 10000 --nodes 4 --duration 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import sys
+import time
+import typing
+
+from yougan import decoder
+from yougan import metrics
+from yougan.client import Client
+from yougan.player import Player
+
+from benchmarks.fakes import TRACK_ID
+from benchmarks.fakes import FakeApp
+from benchmarks.fakes import FakeLavalink
+from benchmarks.suite import _connect
+from benchmarks.suite import _percentile
+
+_Result = typing.Dict[str, typing.Any]
+
+DEFAULT_RATES: typing.Dict[str, float] = {
+    "skip": 1 / 180,
+    "pause": 1 / 600,
+    "seek": 1 / 300,
+}
+"""Actions per player per second."""
+
+
+def _serve(count: int, update_interval: float, ports: typing.Any, stop: typing.Any) -> None:
+    async def serve() -> None:
+        servers = [FakeLavalink(player_update_interval=update_interval, echo_events=True) for _ in range(count)]
+        ports.put([await server.start() for server in servers])
+        await asyncio.get_running_loop().run_in_executor(None, stop.wait)
+        ports.put(sum(server.frames_sent for server in servers))
+        for server in servers:
+            await server.stop()
+
+    asyncio.run(serve())
+
+
+def _histogram_percentile(histogram: metrics.Histogram, percent: float) -> typing.Optional[float]:
+    # Upper bound of the bucket holding the percentile.
+    if not histogram.count:
+        return None
+    target = histogram.count * percent / 100
+    for bound, count in histogram.cumulative():
+        if count >= target:
+            return float(bound)
+    return None
+
+
+async def _monitor_lag(samples: typing.List[float], interval: float = 0.05) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def _drive(
+    players: typing.List[Player], rates: typing.Mapping[str, float], actions: typing.Dict[str, int]
+) -> None:
+    track = decoder.decode_track(TRACK_ID)
+    tick = 0.1
+    carry = dict.fromkeys(rates, 0.0)
+    tasks: typing.Set[asyncio.Task[None]] = set()
+
+    async def act(action: str, player: Player) -> None:
+        if action == "skip":
+            await player.play(track, replace=True)
+        elif action == "pause":
+            await (player.resume() if player.is_paused else player.pause())
+        elif action == "seek":
+            await player.seek(random.randrange(track.length))
+        actions[action] += 1
+
+    while True:
+        await asyncio.sleep(tick)
+        for action, rate in rates.items():
+            carry[action] += len(players) * rate * tick
+            count, carry[action] = int(carry[action]), carry[action] % 1
+            for player in random.sample(players, min(count, len(players))):
+                task = asyncio.get_running_loop().create_task(act(action, player))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+
+async def run(
+    *, players: int, nodes: int, duration: float, update_interval: float, rates: typing.Mapping[str, float]
+) -> _Result:
+    context = multiprocessing.get_context("spawn")
+    ports_queue = context.Queue()
+    stop = context.Event()
+    server = context.Process(target=_serve, args=(nodes, update_interval, ports_queue, stop), daemon=True)
+    server.start()
+    loop = asyncio.get_running_loop()
+    ports: typing.List[int] = await loop.run_in_executor(None, ports_queue.get)
+
+    app = FakeApp()
+    client = Client(app, failover=False)  # type: ignore[arg-type]
+    for index, port in enumerate(ports):
+        client.add_node(name=f"node-{index}", host="127.0.0.1", port=port, password="")
+    for node in client.nodes.values():
+        await _connect(node)
+
+    start = time.perf_counter()
+    for first in range(1, players + 1, 500):
+        await asyncio.gather(
+            *(client.connect_to(guild, guild) for guild in range(first, min(first + 500, players + 1)))
+        )
+    connect_seconds = time.perf_counter() - start
+
+    # Give every player a track so the node starts sending updates for it.
+    track = decoder.decode_track(TRACK_ID)
+    connected: typing.List[Player] = list(client.players.values())
+    await asyncio.gather(*(player.play(track) for player in connected))
+
+    lag: typing.List[float] = []
+    actions = dict.fromkeys(rates, 0)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    monitor = loop.create_task(_monitor_lag(lag))
+    driver = loop.create_task(_drive(connected, rates, actions))
+
+    await asyncio.sleep(duration)
+
+    driver.cancel()
+    monitor.cancel()
+    cpu_seconds = time.process_time() - cpu_start
+    wall_seconds = time.perf_counter() - wall_start
+
+    connections = [node.connection for node in client.nodes.values() if node.connection]
+    frames_received = sum(connection.frames_received for connection in connections)
+    dispatch = metrics.Histogram()
+    for connection in connections:
+        dispatch.counts = [a + b for a, b in zip(dispatch.counts, connection.dispatch_latency.counts)]
+        dispatch.sum += connection.dispatch_latency.sum
+        dispatch.count += connection.dispatch_latency.count
+
+    for node in client.nodes.values():
+        await node.destroy()
+    stop.set()
+    frames_sent = await loop.run_in_executor(None, ports_queue.get)
+    server.join(timeout=10)
+
+    cpu_percent = cpu_seconds / wall_seconds * 100
+    return {
+        "players": players,
+        "nodes": nodes,
+        "duration": wall_seconds,
+        "player_update_interval": update_interval,
+        "connect_seconds": connect_seconds,
+        "actions": actions,
+        "frames_sent_by_nodes": frames_sent,
+        "frames_received": frames_received,
+        "frames_received_per_second": frames_received / wall_seconds,
+        "events_dispatched": dispatch.count,
+        "dispatch_latency_mean_ms": dispatch.sum / dispatch.count * 1000 if dispatch.count else None,
+        "dispatch_latency_p99_upper_bound_ms": (
+            p99 * 1000 if (p99 := _histogram_percentile(dispatch, 99)) is not None else None
+        ),
+        "event_loop_lag_p50_ms": _percentile(lag, 50) * 1000 if lag else None,
+        "event_loop_lag_p99_ms": _percentile(lag, 99) * 1000 if lag else None,
+        "event_loop_lag_max_ms": max(lag) * 1000 if lag else None,
+        "cpu_percent": cpu_percent,
+        "cpu_percent_per_1k_players": cpu_percent / (players / 1000),
+    }
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen", description=__doc__)
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--nodes", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to drive the load for.")
+    parser.add_argument(
+        "--update-interval", type=float, default=5.0, help="Seconds between two playerUpdate of a guild."
+    )
+    for action, rate in DEFAULT_RATES.items():
+        parser.add_argument(
+            f"--{action}-rate", type=float, default=rate, help=f"{action} actions per player per second."
+        )
+    parser.add_argument("--output", "-o", help="Write the results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+
+    rates = {action: getattr(args, f"{action}_rate") for action in DEFAULT_RATES}
+    result = asyncio.run(
+        run(
+            players=args.players,
+            nodes=args.nodes,
+            duration=args.duration,
+            update_interval=args.update_interval,
+            rates=rates,
+        )
+    )
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,201 @@
+"""Throughput and latency benchmarks of yougan against `benchmarks.fakes.FakeLavalink`.
+
+Results are printed (or written with `--output`) as JSON so runs of different
+commits can be compared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import typing
+
+import yougan
+from yougan.client import Client
+from yougan.node import Node
+from yougan.player import Player
+
+from benchmarks.fakes import FakeApp
+from benchmarks.fakes import FakeLavalink
+
+_Result = typing.Dict[str, typing.Any]
+
+
+async def _connect(node: Node) -> None:
+    await node.start(timeout=10)
+
+
+async def _client(lavalink: FakeLavalink) -> Client:
+    client = Client(FakeApp(), failover=False)  # type: ignore[arg-type]
+    client.add_node(name="bench", host="127.0.0.1", port=lavalink.port, password="")
+    await _connect(client.nodes["bench"])
+    return client
+
+
+async def _close(client: Client) -> None:
+    for node in client.nodes.values():
+        await node.destroy()
+
+
+def _percentile(values: typing.List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+async def bench_listen(frames: int, *, subscribed: bool = False) -> _Result:
+    """Frames per second received and handled by `Connection._listen`.
+
+    The `playerUpdate` frames are dropped early unless the player is subscribed to them.
+    """
+    lavalink = FakeLavalink()
+    await lavalink.start()
+    client = await _client(lavalink)
+    node = client.nodes["bench"]
+    assert node.connection
+
+    player: Player = await client.connect_to(1, 2)
+    if subscribed:
+        player.subscribe(0)
+    done = asyncio.Event()
+
+    async def on_done(_: typing.Dict[str, typing.Any]) -> None:
+        done.set()
+
+    node.connection.handlers["benchDone"] = on_done
+    update = json.dumps({"op": "playerUpdate", "guildId": "1", "state": {"time": 1, "position": 1000}})
+    batch = [update] * frames + ['{"op":"benchDone"}']
+
+    start = time.perf_counter()
+    await lavalink.send(batch)
+    await done.wait()
+    elapsed = time.perf_counter() - start
+
+    await _close(client)
+    await lavalink.stop()
+    return {"frames": frames, "seconds": elapsed, "frames_per_second": frames / elapsed}
+
+
+async def bench_search(concurrency_levels: typing.Sequence[int], requests: int, latency: float) -> typing.List[_Result]:
+    """Latency of `Node.search_tracks` with several requests in flight."""
+    lavalink = FakeLavalink(latency=latency)
+    await lavalink.start()
+    client = await _client(lavalink)
+    node = client.nodes["bench"]
+
+    results = []
+    for concurrency in concurrency_levels:
+        latencies: typing.List[float] = []
+        counter = iter(range(requests))
+
+        async def worker() -> None:
+            for index in counter:
+                started = time.perf_counter()
+                await node.search_tracks(f"query {concurrency} {index}", yt=True)
+                latencies.append(time.perf_counter() - started)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        results.append(
+            {
+                "concurrency": concurrency,
+                "requests": requests,
+                "requests_per_second": requests / elapsed,
+                "p50_ms": _percentile(latencies, 50) * 1000,
+                "p95_ms": _percentile(latencies, 95) * 1000,
+                "p99_ms": _percentile(latencies, 99) * 1000,
+                "sockets": node.connections_in_use + node.connections_idle,
+            }
+        )
+
+    await _close(client)
+    await lavalink.stop()
+    return results
+
+
+async def bench_connect(guilds: int) -> _Result:
+    """Throughput of `Client.connect_to` and memory used per player."""
+    lavalink = FakeLavalink()
+    await lavalink.start()
+    client = await _client(lavalink)
+    node = client.nodes["bench"]
+    assert node.connection
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client.connect_to(guild, guild) for guild in range(1, guilds + 1)))
+    await node.connection.flush()
+    elapsed = time.perf_counter() - start
+
+    players: typing.List[Player] = list(client.players.values())
+    for player in players:
+        del node.players[player.guild_id]
+    client.players.clear()
+    await node.connection.flush()
+
+    gc.collect()
+    tracemalloc.start()
+    for guild in range(guilds + 1, 2 * guilds + 1):
+        await client.connect_to(guild, guild)
+    await node.connection.flush()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    await _close(client)
+    await lavalink.stop()
+    return {
+        "guilds": guilds,
+        "seconds": elapsed,
+        "connects_per_second": guilds / elapsed,
+        "bytes_per_player": used / guilds,
+    }
+
+
+def _commit() -> typing.Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(quick: bool = False) -> _Result:
+    scale = 10 if quick else 1
+    return {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "codec": yougan.default_codec().name,
+            "timestamp": time.time(),
+        },
+        "listen": await bench_listen(200_000 // scale),
+        "listen_subscribed": await bench_listen(200_000 // scale, subscribed=True),
+        "search": await bench_search((1, 8, 32, 128), 2048 // scale, latency=0.001),
+        "connect_to": await bench_connect(5000 // scale),
+    }
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--output", "-o", help="Write the results to this file instead of stdout.")
+    parser.add_argument("--quick", action="store_true", help="Run a tenth of the iterations.")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.quick))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
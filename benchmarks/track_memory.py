@@ -0,0 +1,68 @@
+"""Measure the memory used per track when loading a large playlist.
+
+Usage: python -m benchmarks.track_memory [tracks]
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+import typing
+
+from yougan import models
+
+
+def _payload(index: int) -> typing.Dict[str, typing.Any]:
+    return {
+        "track": f"QAAAjQIAJVJpY2sgQXN0bGV5IC0gTmV2ZXIgR29ubmEgR2l2ZSBZb3UgVXAADlJpY2tBc3Rs{index:08d}",
+        "info": {
+            "identifier": f"dQw{index:08d}",
+            "isSeekable": True,
+            "author": "RickAstleyVEVO",
+            "length": 212000,
+            "isStream": False,
+            "position": 0,
+            "title": "Rick Astley - Never Gonna Give You Up",
+            "uri": f"https://www.youtube.com/watch?v=dQw{index:08d}",
+        },
+    }
+
+
+def _measure(build: typing.Callable[[], typing.Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    payloads = [_payload(index) for index in range(count)]
+
+    def materialize() -> typing.List[models.Track]:
+        return [models.Track.from_dict(payload) for payload in payloads]
+
+    def playlist() -> models.YTPlaylist:
+        tracks = getattr(models, "TrackSequence", None)
+        return models.YTPlaylist(
+            name="mix",
+            tracks=tracks(payloads) if tracks else [models.Track.from_dict(payload) for payload in payloads],
+            selected_track=0,
+        )
+
+    def shared() -> typing.List[models.Track]:
+        # The same song queued in every guild.
+        return [models.Track.from_dict(payloads[0]) for _ in range(count)]
+
+    print(f"tracks: {count}")
+    print(f"materialized track:     {_measure(materialize) / count:8.1f} bytes/track")
+    print(f"playlist, none touched: {_measure(playlist) / count:8.1f} bytes/track")
+    print(f"same track per guild:   {_measure(shared) / count:8.1f} bytes/guild")
+
+
+if __name__ == "__main__":
+    main()
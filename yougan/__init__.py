@@ -3,10 +3,18 @@ __license__ = "MIT"
 __copyright__ = "Copyright 2021 (c) ashwinvin"
 __version__ = "0.1.0-dev"
 
-from .client import Client
+from .client import Client, StartupReport
 from .node import Node
 from .player import Player
+from .queue import *
 from .connection import *
 from .models import *
 from .errors import *
-from .stats import Stats
+from .stats import LatencyTracker, Stats, StatsHistory
+from .balancing import *
+from .cache import *
+from .codec import *
+from .metrics import *
+from .regions import *
+from .snapshot import *
+from .tracing import *
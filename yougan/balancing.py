@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import abc
+import bisect
+import typing
+
+if typing.TYPE_CHECKING:
+    from yougan.node import Node
+
+__all__: typing.Tuple[str, ...] = ("NodeStrategy", "PenaltyStrategy", "PlayerCountStrategy", "NodeRanking")
+
+
+class NodeStrategy(abc.ABC):
+    """Base class of the strategies used to rank nodes.
+
+    A lower score means a better node.
+    """
+
+    @abc.abstractmethod
+    def score(self, node: Node) -> float:
+        """Return the score of the given node."""
+
+
+class PenaltyStrategy(NodeStrategy):
+    """Ranks nodes with the penalty formula used by the official lavalink clients.
+
+    The penalty is built from the playing players, the system CPU load and
+    the deficit/nulled frames reported in the last `stats` op. Players placed
+    on the node since that op are counted too, so a burst of new players is
+    spread over the nodes instead of piling onto the same one.
+
+    Parameters
+    ----------
+    latency_weight: builtins.float
+        Penalty added per millisecond of the node's smoothed websocket round
+        trip time. Latency is ignored if this is 0.
+    """
+
+    def __init__(self, *, latency_weight: float = 0.0) -> None:
+        self.latency_weight = latency_weight
+
+    def score(self, node: Node) -> float:
+        stats = node.stats
+        player_penalty = max(stats.active_players, len(node.players))
+
+        # `systemLoad` is already a fraction of the whole CPU, not of a single core.
+        cpu_penalty: float = 1.05 ** (100 * stats.system_load) * 10 - 10
+
+        deficit = max(stats.frames_deficit, 0)
+        nulled = max(stats.frames_nulled, 0)
+        deficit_penalty: float = 1.03 ** (500 * (deficit / 3000)) * 600 - 600
+        nulled_penalty: float = (1.03 ** (500 * (nulled / 3000)) * 300 - 300) * 2
+
+        latency_penalty = self.latency_weight * float(node.ws_latency.smoothed or 0.0) * 1000
+
+        return player_penalty + cpu_penalty + deficit_penalty + nulled_penalty + latency_penalty
+
+
+class PlayerCountStrategy(NodeStrategy):
+    """Ranks nodes by the amount of players connected through them."""
+
+    def score(self, node: Node) -> float:
+        return len(node.players)
+
+
+class NodeRanking:
+    """Nodes kept in ascending order of their score.
+
+    The order is updated one node at a time whenever that node's state changes,
+    so picking the best node never requires sorting all of them.
+
+    Parameters
+    ----------
+    strategy: yougan.balancing.NodeStrategy
+        The strategy used to score the nodes.
+    """
+
+    def __init__(self, strategy: NodeStrategy) -> None:
+        self.strategy = strategy
+        self._order: typing.List[typing.Tuple[float, str]] = []
+        self._scores: typing.Dict[str, float] = {}
+        self._nodes: typing.Dict[str, Node] = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self) -> typing.Iterator[Node]:
+        return (self._nodes[name] for _, name in self._order)
+
+    def update(self, node: Node) -> None:
+        """Insert the node or move it to its new position."""
+        if node.name in self._scores:
+            self._remove(node.name)
+
+        score = self.strategy.score(node)
+        self._scores[node.name] = score
+        self._nodes[node.name] = node
+        bisect.insort(self._order, (score, node.name))
+
+    def discard(self, node: Node) -> None:
+        """Remove the node from the ranking if present."""
+        if node.name in self._scores:
+            self._remove(node.name)
+            del self._nodes[node.name]
+
+    def score_of(self, node: Node) -> typing.Optional[float]:
+        """Return the last computed score of the node."""
+        return self._scores.get(node.name)
+
+    def best(self, regions: typing.AbstractSet[str] = frozenset()) -> typing.Optional[Node]:
+        """Return the connected node with the lowest score.
+
+        Draining nodes are never returned. If none of the other nodes are
+        connected, the one with the lowest score is returned.
+
+        Parameters
+        ----------
+        regions: typing.AbstractSet[builtins.str]
+            Connected nodes tagged with any of these regions are preferred,
+            whatever their score.
+        """
+        fallback = None
+        connected = None
+        for _, name in self._order:
+            node = self._nodes[name]
+            if node.draining:
+                continue
+            if node.is_connected:
+                if not regions or not regions.isdisjoint(node.regions):
+                    return node
+                if connected is None:
+                    connected = node
+            elif fallback is None:
+                fallback = node
+
+        return connected or fallback
+
+    def _remove(self, name: str) -> None:
+        entry = (self._scores.pop(name), name)
+        index = bisect.bisect_left(self._order, entry)
+        del self._order[index]
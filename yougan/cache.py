@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import concurrent.futures
+import logging
+import os
+import sqlite3
+import time
+import typing
+
+from yougan import codec as codec_
+
+__all__: typing.Tuple[str, ...] = ("SearchCache", "DiskCache")
+
+_LOGGER = logging.getLogger("yougan")
+
+_Payload = typing.Dict[str, typing.Any]
+_Loader = typing.Callable[[str], typing.Awaitable[_Payload]]
+_T = typing.TypeVar("_T")
+
+DEFAULT_TTLS: typing.Dict[str, float] = {
+    "TRACK_LOADED": 3600.0,
+    "PLAYLIST_LOADED": 600.0,
+    "SEARCH_RESULT": 300.0,
+    "NO_MATCHES": 60.0,
+    "LOAD_FAILED": 30.0,
+}
+
+
+class SearchCache:
+    """A bounded LRU cache of `/loadtracks` responses.
+
+    Entries are keyed by the final identifier sent to lavalink and expire after
+    a TTL chosen by their load type. Failed loads are cached too, so a broken
+    URL is not requested again until its TTL runs out. Concurrent lookups of
+    the same identifier share a single in-flight request.
+
+    Parameters
+    ----------
+    max_size: builtins.int
+        The maximum amount of entries kept before the least recently used one is evicted.
+    ttls: typing.Optional[typing.Mapping[builtins.str, builtins.float]]
+        Seconds an entry is kept for, per load type. Load types not present are not cached.
+    """
+
+    def __init__(self, max_size: int = 1024, *, ttls: typing.Optional[typing.Mapping[str, float]] = None) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be greater than 0")
+
+        self.max_size = max_size
+        self.ttls: typing.Dict[str, float] = dict(DEFAULT_TTLS if ttls is None else ttls)
+
+        self.hits = 0
+        """Lookups served from the cache."""
+
+        self.misses = 0
+        """Lookups that had to request lavalink."""
+
+        self.coalesced = 0
+        """Lookups that waited on an identical in-flight request."""
+
+        self.evictions = 0
+        """Entries dropped to stay under `max_size`."""
+
+        self.expirations = 0
+        """Entries dropped because their TTL ran out."""
+
+        self._entries: collections.OrderedDict[str, typing.Tuple[float, _Payload]] = collections.OrderedDict()
+        self._inflight: typing.Dict[str, asyncio.Future[_Payload]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, identifier: object) -> bool:
+        return identifier in self._entries
+
+    def get(self, identifier: str) -> typing.Optional[_Payload]:
+        """Return the cached payload for the identifier if it has not expired."""
+        entry = self._entries.get(identifier)
+        if entry is None:
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.monotonic():
+            del self._entries[identifier]
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(identifier)
+        return payload
+
+    def put(self, identifier: str, payload: _Payload) -> None:
+        """Store a payload, evicting the least recently used entries if needed."""
+        ttl = self.ttls.get(payload.get("loadType", ""))
+        if not ttl:
+            return
+
+        self._entries[identifier] = (time.monotonic() + ttl, payload)
+        self._entries.move_to_end(identifier)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, identifier: typing.Optional[str] = None) -> None:
+        """Drop a single entry, or every entry if no identifier is given."""
+        if identifier is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(identifier, None)
+
+    async def get_or_load(self, identifier: str, loader: _Loader) -> _Payload:
+        """Return the cached payload or load it, sharing the request with concurrent callers.
+
+        Parameters
+        ----------
+        identifier: builtins.str
+            The final identifier sent to lavalink.
+        loader: typing.Callable[[builtins.str], typing.Awaitable[typing.Dict[builtins.str, typing.Any]]]
+            Coroutine function that requests the payload from lavalink.
+        """
+        payload = self.get(identifier)
+        if payload is not None:
+            self.hits += 1
+            return payload
+
+        future = self._inflight.get(identifier)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            future = asyncio.ensure_future(self._load(identifier, loader))
+            self._inflight[identifier] = future
+            future.add_done_callback(lambda _: self._inflight.pop(identifier, None))
+
+        # Shielded so a cancelled caller does not cancel the request for everyone else.
+        return await asyncio.shield(future)
+
+    async def _load(self, identifier: str, loader: _Loader) -> _Payload:
+        payload = await loader(identifier)
+        self.put(identifier, payload)
+        return payload
+
+
+_RESULT = 0
+_TRACK = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+
+class DiskCache:
+    """A persistent cache of `/loadtracks` responses and decoded tracks, stored in SQLite.
+
+    The cache survives restarts, so a freshly deployed bot does not send every
+    search back to lavalink. The database is opened in WAL mode, so several bot
+    processes on the same host can share one file.
+
+    Queries run on a dedicated thread and never block the event loop. Errors
+    from the database are logged and treated as misses.
+
+    Parameters
+    ----------
+    path: typing.Union[builtins.str, os.PathLike[builtins.str]]
+        The database file. Created if it does not exist. It must be on a local
+        disk, SQLite locking is unreliable over network filesystems.
+    max_bytes: builtins.int
+        Size of the stored entries above which the least recently used ones are evicted.
+    ttls: typing.Optional[typing.Mapping[builtins.str, builtins.float]]
+        Seconds a `/loadtracks` response is kept for, per load type. Load types not present are not cached.
+    track_ttl: builtins.float
+        Seconds a decoded track is kept for.
+    compact_every: builtins.int
+        Entries written by this process between two compactions.
+    codec: typing.Optional[yougan.codec.JSONCodec]
+        The codec the entries are stored with. Defaults to `yougan.codec.default_codec`.
+    """
+
+    def __init__(
+        self,
+        path: typing.Union[str, os.PathLike[str]],
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttls: typing.Optional[typing.Mapping[str, float]] = None,
+        track_ttl: float = 7 * 24 * 3600.0,
+        compact_every: int = 1000,
+        codec: typing.Optional[codec_.JSONCodec] = None,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than 0")
+
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.ttls: typing.Dict[str, float] = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.track_ttl = track_ttl
+        self.compact_every = compact_every
+        self.codec = codec or codec_.default_codec()
+
+        self.hits = 0
+        """Lookups served from the database."""
+
+        self.misses = 0
+        """Lookups not found in the database, or expired."""
+
+        self.evictions = 0
+        """Entries dropped by this process to stay under `max_bytes`."""
+
+        self.expirations = 0
+        """Expired entries dropped by this process."""
+
+        self._writes = 0
+        self._db: typing.Optional[sqlite3.Connection] = None
+        # A single thread owns the connection, so queries are serialised without locks.
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="yougan-disk-cache")
+
+    async def get_result(self, identifier: str) -> typing.Optional[_Payload]:
+        """Return the stored `/loadtracks` response for the identifier, if any."""
+        value = await self._run(self._get, _RESULT, identifier)
+        return self.codec.loads(value) if value is not None else None
+
+    async def put_result(self, identifier: str, payload: _Payload) -> None:
+        """Store a `/loadtracks` response, if its load type is cached."""
+        ttl = self.ttls.get(payload.get("loadType", ""))
+        if ttl:
+            await self._run(self._put, _RESULT, [(identifier, self._dumps(payload))], ttl)
+
+    async def get_track(self, track_id: str) -> typing.Optional[_Payload]:
+        """Return the stored info of a track, if any."""
+        tracks = await self.get_tracks([track_id])
+        return tracks.get(track_id)
+
+    async def get_tracks(self, track_ids: typing.Sequence[str]) -> typing.Dict[str, _Payload]:
+        """Return the stored info of the tracks found in the database, by track id."""
+        values = await self._run(self._get_many, _TRACK, list(track_ids))
+        return {track_id: self.codec.loads(value) for track_id, value in (values or {}).items()}
+
+    async def put_track(self, track_id: str, info: _Payload) -> None:
+        """Store the info of a decoded track."""
+        await self.put_tracks({track_id: info})
+
+    async def put_tracks(self, tracks: typing.Mapping[str, _Payload]) -> None:
+        """Store the info of several decoded tracks, by track id."""
+        if tracks:
+            items = [(track_id, self._dumps(info)) for track_id, info in tracks.items()]
+            await self._run(self._put, _TRACK, items, self.track_ttl)
+
+    async def compact(self) -> None:
+        """Drop the expired entries, then the least recently used ones until the cache fits in `max_bytes`."""
+        await self._run(self._compact)
+
+    async def clear(self) -> None:
+        """Drop every entry, for every process sharing the database."""
+        await self._run(self._clear)
+
+    async def close(self) -> None:
+        """Close the database."""
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
+
+    async def _run(self, function: typing.Callable[..., _T], *args: typing.Any) -> typing.Optional[_T]:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        except sqlite3.Error as exc:
+            _LOGGER.warning("Disk cache %s failed: %r", self.path, exc)
+            return None
+
+    # Everything below runs on the cache thread.
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            db.execute("PRAGMA journal_mode = WAL")
+            db.execute("PRAGMA synchronous = NORMAL")
+            db.executescript(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def _get(self, kind: int, key: str) -> typing.Optional[bytes]:
+        return self._get_many(kind, [key]).get(key)
+
+    def _get_many(self, kind: int, keys: typing.List[str]) -> typing.Dict[str, bytes]:
+        db = self._connect()
+        now = time.time()
+        found: typing.Dict[str, bytes] = {}
+        # Keeps the statements under SQLite's default limit of 999 variables.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = db.execute(
+                f"SELECT key, value FROM entries WHERE kind = ? AND expires_at > ? AND key IN ({placeholders})",
+                (kind, now, *chunk),
+            )
+            found.update(rows)
+
+        if found:
+            # Access times are only refreshed once a minute to keep reads mostly read-only.
+            db.executemany(
+                "UPDATE entries SET accessed_at = ? WHERE kind = ? AND key = ? AND accessed_at < ?",
+                [(now, kind, key, now - 60) for key in found],
+            )
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def _put(self, kind: int, items: typing.List[typing.Tuple[str, bytes]], ttl: float) -> None:
+        db = self._connect()
+        now = time.time()
+        with db:
+            db.execute("BEGIN")
+            db.executemany(
+                "INSERT OR REPLACE INTO entries (kind, key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(kind, key, value, len(key) + len(value), now + ttl, now) for key, value in items],
+            )
+
+        self._writes += len(items)
+        if self._writes >= self.compact_every:
+            self._compact()
+
+    def _compact(self) -> None:
+        db = self._connect()
+        self._writes = 0
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            self.expirations += db.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),)).rowcount
+
+            (total,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+            if total > self.max_bytes:
+                # Evicts down to 90% of the limit, so the next writes do not trigger another eviction right away.
+                target = self.max_bytes * 0.9
+                evicted: typing.List[typing.Tuple[int, str]] = []
+                for kind, key, size in db.execute("SELECT kind, key, size FROM entries ORDER BY accessed_at"):
+                    if total <= target:
+                        break
+                    evicted.append((kind, key))
+                    total -= size
+                db.executemany("DELETE FROM entries WHERE kind = ? AND key = ?", evicted)
+                self.evictions += len(evicted)
+
+        db.execute("PRAGMA incremental_vacuum")
+
+    def _dumps(self, value: typing.Any) -> bytes:
+        return self.codec.dumps(value).encode()
+
+    def _clear(self) -> None:
+        self._connect().execute("DELETE FROM entries")
+
+    def _close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,29 +1,87 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import logging
 import typing
 
-import aiohttp
+from hikari import snowflakes
+
+from yougan import balancing
+from yougan import cache
+from yougan import codec
+from yougan import events
+from yougan import regions
+from yougan import snapshot as snapshots
+from yougan import tracing
+from yougan.connection import HTTPOptions, ReconnectOptions, SendQueueOptions
 from yougan.node import Node
 from yougan.player import Player
+from yougan.queue import RepeatMode
 
 if typing.TYPE_CHECKING:
+    import os
+
     from hikari import channels
     from hikari import guilds
-    from hikari import snowflakes
     from hikari import impl
     from yougan import models
 
 _PT = typing.TypeVar("_PT", bound=Player)
 
-__all__: typing.Tuple[str, ...] = ("Client",)
+__all__: typing.Tuple[str, ...] = ("Client", "StartupReport")
+_LOGGER = logging.getLogger("yougan")
+
+
+class StartupReport:
+    """Outcome of `Client.start_nodes`."""
+
+    __slots__ = ("connected", "failed", "pending")
+
+    def __init__(self) -> None:
+        self.connected: typing.List[str] = []
+        """Names of the nodes which came up, in the order they did."""
+
+        self.failed: typing.Dict[str, BaseException] = {}
+        """Nodes which could not be started, with the reason."""
+
+        self.pending: typing.List[str] = []
+        """Nodes still connecting in the background once the quorum was reached."""
+
+    def __repr__(self) -> str:
+        return f"StartupReport(connected={self.connected!r}, failed={list(self.failed)!r}, pending={self.pending!r})"
 
 
 class Client:
-    def __init__(self, app: impl.GatewayBot) -> None:
+    def __init__(
+        self,
+        app: impl.GatewayBot,
+        *,
+        strategy: typing.Optional[balancing.NodeStrategy] = None,
+        search_cache: typing.Optional[cache.SearchCache] = None,
+        disk_cache: typing.Optional[cache.DiskCache] = None,
+        json_codec: typing.Optional[codec.JSONCodec] = None,
+        failover: bool = True,
+        failover_delay: typing.Optional[float] = None,
+        region_resolver: typing.Optional[regions.RegionResolver] = None,
+        player_update_interval: typing.Optional[float] = 30.0,
+    ) -> None:
         self.app = app
+        self.region_resolver = region_resolver or regions.RegionResolver()
         self.nodes: typing.Dict[str, Node] = {}
-        self.session: typing.Optional[aiohttp.ClientSession] = None
         self.players: typing.Dict[int, _PT] = {}
+        self.ranking = balancing.NodeRanking(strategy or balancing.PenaltyStrategy())
+        self.search_cache = search_cache
+        self.disk_cache = disk_cache
+        self.codec = json_codec or codec.default_codec()
+        self.failover_delay = failover_delay
+        self.player_update_interval = player_update_interval
+        self._failovers: typing.Dict[str, asyncio.Task[None]] = {}
+        self._startups: typing.Dict[str, asyncio.Task[None]] = {}
+
+        if failover:
+            app.event_manager.subscribe(events.NodeDisconnectedEvent, self._on_node_disconnected)
+            app.event_manager.subscribe(events.NodeConnectedEvent, self._on_node_connected)
 
     @property
     def is_connected(self) -> bool:
@@ -33,9 +91,35 @@ class Client:
                 return True
         return False
 
+    def get_best_node(self, endpoint: typing.Optional[str] = None) -> Node:
+        """Get the node with the lowest score according to the node strategy.
+
+        Parameters
+        ----------
+        endpoint: typing.Optional[builtins.str]
+            A Discord voice endpoint. Connected nodes tagged with its region
+            are preferred, the other nodes are used if none are.
+
+        Returns
+        -------
+        yougan.node.Node
+            The best available node.
+        """
+        node = self.ranking.best(self.region_resolver.resolve(endpoint))
+        if not node:
+            raise RuntimeError("No nodes have been added to the client")
+        return node
+
+    def _select_node(self, endpoint: str, current: typing.Optional[Node] = None) -> Node:
+        # Players stay where they are unless a node closer to their voice server is available.
+        tags = self.region_resolver.resolve(endpoint)
+        if current and current.is_connected and not current.draining and not tags.isdisjoint(current.regions):
+            return current
 
-    def get_best_node(self) -> Node:
-        return sorted(self.nodes.values(), key=lambda node: len(node.players))[0]
+        node = self.get_best_node(endpoint)
+        if current and current.is_connected and not current.draining and tags.isdisjoint(node.regions):
+            return current
+        return node
 
     def get_player(self, guild_id: snowflakes.SnowflakeishOr[guilds.Guild]) -> typing.Optional[Player]:
         """Get the player which is active in a specific guild
@@ -66,54 +150,460 @@ class Client:
         cls: typing.Type[_PT] = Player,
     ) -> _PT:
         """Connect to the given voice channel.
-        
+
         Parameters
         ----------
         guild: hikari.snowflakes.SnowflakeishOr[hikari.guilds.Guild]
             The guild to join.
         channel: hikari.snowflakes.SnowflakeishOr[hikari.channels.GuildVoiceChannel],
             The voice channel to join.
-        
+
         Other Parameters
         ----------------
-        
-        
+        node: typing.Optional[yougan.node.Node]
+            The node to play from. If not given, the best node in the region
+            of the voice server Discord assigns is picked.
         """
         if not issubclass(cls, Player):
             raise TypeError(f"Expected cls to derived from Player but got {type(cls)}")
 
-        if not node:
-            node = self.get_best_node()
+        if tracing.observers:
+            with tracing.Span("yougan.connect_to", node=node.name if node else None, guild_id=int(guild)) as span:
+                player = await self._connect_to(guild, channel, deaf=deaf, mute=mute, node=node, cls=cls)
+                span.node = player.node.name
+                return player
+        return await self._connect_to(guild, channel, deaf=deaf, mute=mute, node=node, cls=cls)
 
-        if node not in self.nodes.values():
+    async def _connect_to(
+        self,
+        guild: snowflakes.SnowflakeishOr[guilds.Guild],
+        channel: snowflakes.SnowflakeishOr[channels.GuildVoiceChannel],
+        *,
+        deaf: bool,
+        mute: bool,
+        node: typing.Optional[Node],
+        cls: typing.Type[_PT],
+    ) -> _PT:
+        if node is None:
+            if not self.ranking:
+                raise RuntimeError("No nodes have been added to the client")
+        elif node not in self.nodes.values():
             raise Exception("Unknown Node Provided")
 
-        self.players[int(guild)] = await self.app.voice.connect_to(
-            guild, channel, cls, deaf=deaf, mute=mute, node=node
+        # The voice endpoint is only known once Discord answers, so the node is picked by the player.
+        player = await self.app.voice.connect_to(
+            guild, channel, cls, deaf=deaf, mute=mute, node=node, select_node=self._select_node
         )
-        node.players[int(guild)] = self.players[int(guild)]
-        return self.players[int(guild)]
+        self.players[int(guild)] = player
+        player.node.players[int(guild)] = player
+        player.node.refresh_rank()
+        return player
 
-    async def disconnect(self) -> None:
-        for connection in self.players.values():
-            await connection.disconnect()  # Is this really required?
+    async def drain_node(self, name: str) -> typing.Dict[int, Exception]:
+        """Move every player of a node to the other nodes and keep new players off it.
 
-        for node in self.nodes.values():
-            await node.destroy()
+        Parameters
+        ----------
+        name: builtins.str
+            The name of the node to drain.
+
+        Returns
+        -------
+        typing.Dict[builtins.int, builtins.Exception]
+            The players which could not be moved, by guild id.
+        """
+        node = self.nodes[name]
+        node.draining = True
+        return await self._move_players(node)
+
+    def undrain_node(self, name: str) -> None:
+        """Allow new players to be placed on a previously drained node."""
+        self.nodes[name].draining = False
+
+    async def _move_players(self, node: Node) -> typing.Dict[int, Exception]:
+        async def move(player: Player) -> None:
+            target = self.get_best_node(player._endpoint)
+            if target is node:
+                raise RuntimeError(f"No other node available to move players from Node::{node.name}")
+            await player.move_to(target)
+
+        players = list(node.players.values())
+        results = await asyncio.gather(*(move(player) for player in players), return_exceptions=True)
+
+        failures: typing.Dict[int, Exception] = {}
+        for player, result in zip(players, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Failed to move player in guild %s: %s", player.guild_id, result)
+                failures[int(player.guild_id)] = result
+        return failures
+
+    async def _on_node_disconnected(self, event: events.NodeDisconnectedEvent) -> None:
+        node = event.node
+        if self.nodes.get(node.name) is not node or node.name in self._failovers:
+            return
+
+        delay = self.failover_delay
+        if delay is None:
+            # Lavalink keeps the players until the resume timeout runs out, there is no point in moving them earlier.
+            delay = node.connection.reconnect_options.resume_timeout if node.connection else 0
+
+        self._failovers[node.name] = asyncio.get_running_loop().create_task(
+            self._failover(node, delay), name=f"Failover for Node::{node.name}"
+        )
+
+    async def _failover(self, node: Node, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+            if node.is_connected or not node.players:
+                return
+
+            _LOGGER.warning("Moving %s players away from unreachable Node::%s", len(node.players), node.name)
+            await self._move_players(node)
+        finally:
+            self._failovers.pop(node.name, None)
+
+    async def _on_node_connected(self, event: events.NodeConnectedEvent) -> None:
+        node = event.node
+        if task := self._failovers.pop(node.name, None):
+            task.cancel()
+
+        if event.resumed or not node.players:
+            return
+
+        # The session was not resumed, so lavalink no longer knows about these players.
+        _LOGGER.info("Restoring %s players on Node::%s", len(node.players), node.name)
+        await asyncio.gather(*(player._replay() for player in list(node.players.values())), return_exceptions=True)
+
+    async def _bulk(
+        self,
+        guild_ids: typing.Optional[typing.Iterable[snowflakes.SnowflakeishOr[guilds.Guild]]],
+        action: typing.Callable[[Node, typing.List[int]], typing.Awaitable[typing.Dict[int, Exception]]],
+    ) -> typing.Dict[int, Exception]:
+        # Groups the players by node so each node queues its frames as one batch, nodes are handled concurrently.
+        failures: typing.Dict[int, Exception] = {}
+        groups: typing.Dict[str, typing.Tuple[Node, typing.List[int]]] = {}
+        for guild in list(self.players) if guild_ids is None else guild_ids:
+            player: typing.Optional[Player] = self.players.get(int(guild))
+            if player is None:
+                failures[int(guild)] = LookupError(f"No player in guild {int(guild)}")
+            else:
+                groups.setdefault(player.node.name, (player.node, []))[1].append(int(guild))
+
+        batches = list(groups.values())
+        results = await asyncio.gather(*(action(node, ids) for node, ids in batches), return_exceptions=True)
+        for (node, ids), result in zip(batches, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Bulk operation failed on Node::%s: %r", node.name, result)
+                failures.update((guild_id, result) for guild_id in ids)
+            elif isinstance(result, BaseException):
+                # Cancellation and interrupts are not failures of the players.
+                raise result
+            else:
+                failures.update(result)
+        return failures
+
+    async def pause_players(
+        self,
+        guild_ids: typing.Optional[typing.Iterable[snowflakes.SnowflakeishOr[guilds.Guild]]] = None,
+        *,
+        pause: bool = True,
+    ) -> typing.Dict[int, Exception]:
+        """Pause or resume many players at once.
+
+        Parameters
+        ----------
+        guild_ids: typing.Optional[typing.Iterable[hikari.snowflakes.SnowflakeishOr[hikari.guilds.Guild]]]
+            The guilds whose player is paused. Every player if `None`.
+        pause: builtins.bool
+            Resume the players instead if false.
+
+        Returns
+        -------
+        typing.Dict[builtins.int, builtins.Exception]
+            The players which could not be paused, by guild id.
+        """
+        return await self._bulk(guild_ids, lambda node, ids: node.pause_players(ids, pause=pause))
+
+    async def set_players_volume(
+        self, volume: int, guild_ids: typing.Optional[typing.Iterable[snowflakes.SnowflakeishOr[guilds.Guild]]] = None
+    ) -> typing.Dict[int, Exception]:
+        """Set the volume of many players at once.
+
+        Parameters
+        ----------
+        volume: builtins.int
+            The volume to set.
+        guild_ids: typing.Optional[typing.Iterable[hikari.snowflakes.SnowflakeishOr[hikari.guilds.Guild]]]
+            The guilds whose player is changed. Every player if `None`.
+
+        Returns
+        -------
+        typing.Dict[builtins.int, builtins.Exception]
+            The players whose volume could not be set, by guild id.
+        """
+        return await self._bulk(guild_ids, lambda node, ids: node.set_players_volume(volume, ids))
 
-    def add_node(self, *, name: str, host: str, port: int, password: str) -> None:
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        self.nodes[name] = Node(name=name, host=host, port=port, password=password, app=self.app, session=self.session)
+    async def stop_players(
+        self, guild_ids: typing.Optional[typing.Iterable[snowflakes.SnowflakeishOr[guilds.Guild]]] = None
+    ) -> typing.Dict[int, Exception]:
+        """Stop the current track of many players at once.
+
+        Parameters
+        ----------
+        guild_ids: typing.Optional[typing.Iterable[hikari.snowflakes.SnowflakeishOr[hikari.guilds.Guild]]]
+            The guilds whose player is stopped. Every player if `None`.
+
+        Returns
+        -------
+        typing.Dict[builtins.int, builtins.Exception]
+            The players which could not be stopped, by guild id.
+        """
+        return await self._bulk(guild_ids, lambda node, ids: node.stop_players(ids))
+
+    async def destroy_players(
+        self, guild_ids: typing.Optional[typing.Iterable[snowflakes.SnowflakeishOr[guilds.Guild]]] = None
+    ) -> typing.Dict[int, Exception]:
+        """Destroy many players at once and leave their voice channel.
+
+        Players of a shard can be destroyed with
+        `client.destroy_players(guild for guild, player in client.players.items() if player.shard_id == 3)`.
+
+        Parameters
+        ----------
+        guild_ids: typing.Optional[typing.Iterable[hikari.snowflakes.SnowflakeishOr[hikari.guilds.Guild]]]
+            The guilds whose player is destroyed. Every player if `None`.
+
+        Returns
+        -------
+        typing.Dict[builtins.int, builtins.Exception]
+            The players which could not be destroyed, by guild id.
+        """
+        targets = list(self.players) if guild_ids is None else [int(guild) for guild in guild_ids]
+        failures = await self._bulk(targets, lambda node, ids: node.destroy_players(ids))
+        for guild_id in targets:
+            if guild_id not in failures:
+                self.players.pop(guild_id, None)
+        return failures
+
+    async def snapshot(self, path: typing.Union[str, os.PathLike[str]]) -> int:
+        """Save the state of every player to a file, to be restored with `Client.restore`.
+
+        Parameters
+        ----------
+        path: typing.Union[builtins.str, os.PathLike[builtins.str]]
+            The file to write. It is replaced atomically.
+
+        Returns
+        -------
+        builtins.int
+            The amount of players saved.
+        """
+        states = [snapshots.PlayerState.from_player(player) for player in self.players.values()]
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(snapshots.dump_states, path, states, codec=self.codec)
+        )
+
+    async def restore(
+        self, path: typing.Union[str, os.PathLike[str]], *, joins_per_second: float = 2.0
+    ) -> typing.Dict[int, Exception]:
+        """Rejoin the voice channels saved by `Client.snapshot` and resume playback where it was.
+
+        Guilds of different shards rejoin concurrently. Within a shard, joins
+        are started at most `joins_per_second` times per second to stay within
+        the gateway rate limit, without waiting for the previous join to finish.
+        Players return to the node they were on if it is available, and are
+        placed like new players otherwise.
+
+        Parameters
+        ----------
+        path: typing.Union[builtins.str, os.PathLike[builtins.str]]
+            The file written by `Client.snapshot`.
+        joins_per_second: builtins.float
+            Voice channels joined per second on each shard.
+
+        Returns
+        -------
+        typing.Dict[builtins.int, builtins.Exception]
+            The players which could not be restored, by guild id.
+        """
+        if joins_per_second <= 0:
+            raise ValueError("joins_per_second must be greater than 0")
+
+        states = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(snapshots.load_states, path, codec=self.codec)
+        )
+        shards: typing.Dict[int, typing.List[snapshots.PlayerState]] = {}
+        for state in states:
+            shard_id = snowflakes.calculate_shard_id(self.app.shard_count, state.guild_id)
+            shards.setdefault(shard_id, []).append(state)
+
+        async def rejoin_shard(
+            shard_states: typing.List[snapshots.PlayerState],
+        ) -> typing.List[typing.Union[Player, BaseException]]:
+            tasks = []
+            for index, state in enumerate(shard_states):
+                if index:
+                    await asyncio.sleep(1 / joins_per_second)
+                tasks.append(asyncio.ensure_future(self._restore_player(state)))
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        batches = list(shards.values())
+        results = await asyncio.gather(*(rejoin_shard(batch) for batch in batches))
+
+        failures: typing.Dict[int, Exception] = {}
+        for batch, batch_results in zip(batches, results):
+            for state, result in zip(batch, batch_results):
+                if isinstance(result, Exception):
+                    _LOGGER.warning("Failed to restore player in guild %s: %r", state.guild_id, result)
+                    failures[state.guild_id] = result
+        _LOGGER.info("Restored %s of %s players", len(states) - len(failures), len(states))
+        return failures
+
+    async def _restore_player(self, state: snapshots.PlayerState) -> Player:
+        node = self.nodes.get(state.node)
+        if node is not None and (not node.is_connected or node.draining):
+            node = None
+
+        player: Player = await self.connect_to(state.guild_id, state.channel_id, node=node)
+        player.volume = state.volume
+        player.queue.push(*state.queue)
+        player.queue.repeat = RepeatMode(state.repeat)
+        if state.track:
+            player._current_track = await player.node.fetch_track(state.track)
+            player._set_position(state.position)
+            player.is_stopped = False
+            player.is_paused = state.paused
+
+        await player._send_state()
+        return player
+
+    async def disconnect(self, *, timeout: typing.Optional[float] = 5.0) -> None:
+        """Disconnect every player, then close every node.
+
+        Players and nodes are closed concurrently, so one unresponsive node
+        does not hold up the others.
+
+        Parameters
+        ----------
+        timeout: typing.Optional[builtins.float]
+            Seconds given to each player to disconnect, and to each node to send its queued frames.
+        """
+        players: typing.List[Player] = list(self.players.values())
+        results = await asyncio.gather(
+            *(asyncio.wait_for(player.disconnect(), timeout) for player in players), return_exceptions=True
+        )
+        for player, result in zip(players, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Failed to disconnect player in guild %s: %r", player.guild_id, result)
+
+        for task in self._startups.values():
+            task.cancel()
+
+        nodes = list(self.nodes.values())
+        results = await asyncio.gather(*(node.destroy(timeout=timeout) for node in nodes), return_exceptions=True)
+        for node, result in zip(nodes, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Failed to close Node::%s: %r", node.name, result)
+
+    def add_node(
+        self,
+        *,
+        name: str,
+        host: str,
+        port: int,
+        password: str,
+        send_options: typing.Optional[SendQueueOptions] = None,
+        reconnect_options: typing.Optional[ReconnectOptions] = None,
+        http_options: typing.Optional[HTTPOptions] = None,
+        regions: typing.Optional[typing.Iterable[str]] = None,
+    ) -> None:
+        node = Node(
+            name=name,
+            host=host,
+            port=port,
+            password=password,
+            app=self.app,
+            ranking=self.ranking,
+            search_cache=self.search_cache,
+            disk_cache=self.disk_cache,
+            codec=self.codec,
+            send_options=send_options,
+            reconnect_options=reconnect_options,
+            http_options=http_options or HTTPOptions(),
+            regions=frozenset(regions or ()),
+            player_update_interval=self.player_update_interval,
+        )
+        self.nodes[name] = node
+        self.ranking.update(node)
 
     async def remove_node(self, name: str) -> None:
-        if self.nodes[name].is_connected:
-            await self.nodes[name].destroy()
-        del self.nodes[name]
+        await self.nodes[name].destroy()
+        self.ranking.discard(self.nodes.pop(name))
 
-    async def start_nodes(self) -> None:
-        for node in self.nodes.values():
-            await node.start()
+    async def start_nodes(
+        self, *, timeout: typing.Optional[float] = 30.0, quorum: typing.Optional[int] = None
+    ) -> StartupReport:
+        """Connect to every node which is not connected yet, concurrently.
+
+        Parameters
+        ----------
+        timeout: typing.Optional[builtins.float]
+            Seconds given to each node to connect.
+        quorum: typing.Optional[builtins.int]
+            Return as soon as this many nodes are connected, counting the ones
+            which already were, the others keep connecting in the background.
+            Waits for every node if `None`.
+
+        Returns
+        -------
+        yougan.client.StartupReport
+            The nodes which came up, failed, or are still connecting.
+        """
+        if quorum is not None and not 0 < quorum <= len(self.nodes):
+            raise ValueError(f"quorum must be between 1 and the {len(self.nodes)} nodes")
+
+        loop = asyncio.get_running_loop()
+        report = StartupReport()
+        tasks: typing.Dict[asyncio.Task[None], str] = {}
+        for name, node in self.nodes.items():
+            if node.is_connected:
+                report.connected.append(name)
+                continue
+            # Nodes left connecting by a previous call are waited on rather than started again.
+            task = self._startups.get(name)
+            if task is None:
+                task = self._startups[name] = loop.create_task(
+                    node.start(timeout=timeout), name=f"Startup of Node::{name}"
+                )
+                task.add_done_callback(functools.partial(self._on_startup_done, name))
+            tasks[task] = name
+
+        required = len(self.nodes) if quorum is None else quorum
+        pending: typing.Set[asyncio.Task[None]] = set(tasks)
+        while pending and (quorum is None or len(report.connected) < quorum):
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    report.failed[tasks[task]] = asyncio.CancelledError()
+                elif exc := task.exception():
+                    report.failed[tasks[task]] = exc
+                else:
+                    report.connected.append(tasks[task])
+
+            # Give up early once the quorum can no longer be reached.
+            if quorum is not None and len(report.connected) + len(pending) < quorum:
+                break
+
+        report.pending.extend(tasks[task] for task in pending)
+        if len(report.connected) < required:
+            _LOGGER.error("Only %s of the %s required nodes could be started", len(report.connected), required)
+        return report
+
+    def _on_startup_done(self, name: str, task: asyncio.Task[None]) -> None:
+        if self._startups.get(name) is task:
+            del self._startups[name]
+        if not task.cancelled() and (exc := task.exception()):
+            _LOGGER.error("Failed to start Node::%s: %r", name, exc)
 
     async def search_track(
         self,
@@ -128,3 +618,7 @@ class Client:
     async def fetch_track(self, track_id: str) -> models.Track:
         node = self.get_best_node()
         return await node.fetch_track(track_id)
+
+    async def fetch_tracks(self, track_ids: typing.Sequence[str]) -> typing.List[models.Track]:
+        node = self.get_best_node()
+        return await node.fetch_tracks(track_ids)
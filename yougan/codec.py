@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import abc
+import json
+import types
+import typing
+
+orjson: typing.Optional[types.ModuleType]
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+__all__: typing.Tuple[str, ...] = ("JSONCodec", "StdlibCodec", "OrjsonCodec", "UjsonCodec", "default_codec")
+
+
+class JSONCodec(abc.ABC):
+    """Base class of the JSON codecs used for the websocket and REST payloads."""
+
+    name: typing.ClassVar[str]
+
+    @abc.abstractmethod
+    def dumps(self, obj: typing.Any) -> str:
+        """Serialize the object to a JSON string."""
+
+    @abc.abstractmethod
+    def loads(self, data: typing.Union[str, bytes]) -> typing.Any:
+        """Deserialize a JSON document.
+
+        Raw bytes are accepted so REST bodies don't have to be decoded to a string first.
+        """
+
+
+class StdlibCodec(JSONCodec):
+    """Codec using the standard library `json` module."""
+
+    name = "json"
+
+    def __init__(self) -> None:
+        self._encoder = json.JSONEncoder(separators=(",", ":"))
+        self._decoder = json.JSONDecoder()
+
+    def dumps(self, obj: typing.Any) -> str:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: typing.Union[str, bytes]) -> typing.Any:
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        return self._decoder.decode(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec using `orjson`."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise RuntimeError("orjson is not installed")
+        self._dumps: typing.Callable[[typing.Any], bytes] = orjson.dumps
+        self._loads: typing.Callable[[typing.Union[str, bytes]], typing.Any] = orjson.loads
+
+    def dumps(self, obj: typing.Any) -> str:
+        return self._dumps(obj).decode("utf-8")
+
+    def loads(self, data: typing.Union[str, bytes]) -> typing.Any:
+        return self._loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """Codec using `ujson`."""
+
+    name = "ujson"
+
+    def __init__(self) -> None:
+        if ujson is None:
+            raise RuntimeError("ujson is not installed")
+        self._dumps: typing.Callable[[typing.Any], str] = ujson.dumps
+        self._loads: typing.Callable[[typing.Union[str, bytes]], typing.Any] = ujson.loads
+
+    def dumps(self, obj: typing.Any) -> str:
+        return self._dumps(obj)
+
+    def loads(self, data: typing.Union[str, bytes]) -> typing.Any:
+        return self._loads(data)
+
+
+def default_codec() -> JSONCodec:
+    """Return the fastest codec available, preferring orjson, then ujson, then the standard library."""
+    if orjson is not None:
+        return OrjsonCodec()
+    if ujson is not None:
+        return UjsonCodec()
+    return StdlibCodec()
@@ -1,25 +1,218 @@
 from __future__ import annotations
 
 import asyncio
+import collections
 import logging
+import random
+import re
+import secrets
+import time
 import typing
-import json
 
 import aiohttp
 from hikari.errors import ComponentStateConflictError
 
 from yougan import events
 from yougan import errors
+from yougan import metrics
+from yougan import tracing
 from yougan.player import Player
 
 if typing.TYPE_CHECKING:
     from yougan.node import Node
 
 
-__all__: typing.Tuple[str, ...] = ("Connection",)
+__all__: typing.Tuple[str, ...] = ("Connection", "SendQueueOptions", "ReconnectOptions", "HTTPOptions")
 
 _LOGGER = logging.getLogger("yougan-websocket")
 
+_Payload = typing.Dict[str, typing.Any]
+
+_COALESCED_OPS = frozenset(("pause", "volume", "seek", "filters", "equalizer"))
+"""Ops for which only the latest frame matters when several are queued back to back for a guild."""
+
+_PLAYER_UPDATE = re.compile(r'"op"\s*:\s*"playerUpdate"')
+_GUILD_ID = re.compile(r'"guildId"\s*:\s*"(\d+)"')
+
+
+_TRACK_EVENTS: typing.Dict[str, typing.Callable[[typing.Any, _Payload, Player], events.TrackEvent]] = {
+    "TrackStartEvent": lambda app, payload, player: events.TrackStartEvent(
+        app=app, track=payload["track"], player=player
+    ),
+    "TrackEndEvent": lambda app, payload, player: events.TrackEndEvent(
+        app=app, track=payload["track"], reason=payload["reason"], player=player
+    ),
+    "TrackStuckEvent": lambda app, payload, player: events.TrackStuckEvent(
+        app=app, track=payload["track"], threshold=int(payload["thresholdMs"]), player=player
+    ),
+    "TrackExceptionEvent": lambda app, payload, player: events.TrackExceptionEvent(
+        app=app,
+        track=payload["track"],
+        error=payload.get("error") or payload["exception"]["message"],
+        player=player,
+    ),
+}
+"""Builders of the track events, by the `type` of the `event` op."""
+
+
+class SendQueueOptions:
+    """Settings of the outbound frame queue of a connection.
+
+    Parameters
+    ----------
+    max_pending: builtins.int
+        The amount of queued frames at which senders start waiting (or failing
+        if `fail_fast` is set).
+    coalesce_window: builtins.float
+        Seconds the writer waits after the first queued frame to collect more
+        frames. Repeated `pause`/`volume`/`seek`/`filters` frames for a guild
+        queued back to back are collapsed into the last one.
+    fail_fast: builtins.bool
+        Raise `yougan.errors.SendQueueFull` instead of waiting when the queue is full.
+    """
+
+    def __init__(self, *, max_pending: int = 1000, coalesce_window: float = 0.0, fail_fast: bool = False) -> None:
+        if max_pending <= 0:
+            raise ValueError("max_pending must be greater than 0")
+        self.max_pending = max_pending
+        self.coalesce_window = coalesce_window
+        self.fail_fast = fail_fast
+
+
+class ReconnectOptions:
+    """Settings used to reconnect and resume a dropped lavalink connection.
+
+    Parameters
+    ----------
+    base_delay: builtins.float
+        Seconds to wait before the first reconnect attempt. The delay doubles
+        after every failed attempt.
+    max_delay: builtins.float
+        Upper bound of the delay between two attempts.
+    max_attempts: typing.Optional[builtins.int]
+        Attempts made before giving up on the node. Retries forever if `None`.
+    resume_timeout: builtins.int
+        Seconds lavalink keeps the players alive after the connection drops.
+        Resuming is disabled if this is 0.
+    resume_key: typing.Optional[builtins.str]
+        Key used to resume the session. A random key is generated if not given.
+    ping_interval: typing.Optional[builtins.float]
+        Seconds between two websocket pings, used to measure the round trip
+        time to the node. Pings are disabled if `None`.
+    ping_timeout: builtins.float
+        Seconds to wait for a pong before the socket is considered dead and
+        closed, so it is reconnected instead of silently losing frames.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        max_attempts: typing.Optional[int] = None,
+        resume_timeout: int = 60,
+        resume_key: typing.Optional[str] = None,
+        ping_interval: typing.Optional[float] = 10.0,
+        ping_timeout: float = 10.0,
+    ) -> None:
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.resume_timeout = resume_timeout
+        self.resume_key = resume_key or secrets.token_hex(16)
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+
+    def delay(self, attempt: int) -> float:
+        """Return the jittered delay before the given attempt."""
+        cap = min(self.max_delay, self.base_delay * 2**attempt)
+        return random.uniform(cap / 2, cap)
+
+
+class HTTPOptions:
+    """Settings of the HTTP connection pool of a node.
+
+    Every node gets its own pool, so a burst of requests to one node cannot
+    use up the sockets of the others.
+
+    Parameters
+    ----------
+    max_connections: builtins.int
+        Sockets opened to the node at most, the websocket included.
+    max_concurrent_requests: builtins.int
+        REST requests made to the node at once. Further requests wait for one
+        of them to finish.
+    keepalive_timeout: builtins.float
+        Seconds an idle connection is kept open to be reused.
+    dns_cache_ttl: typing.Optional[builtins.int]
+        Seconds the address of the node is cached for. Cached forever if `None`.
+    connect_timeout: typing.Optional[builtins.float]
+        Seconds to wait for a connection to the node, pool wait included.
+    request_timeout: typing.Optional[builtins.float]
+        Seconds a REST request may take in total.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 16,
+        max_concurrent_requests: int = 8,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: typing.Optional[int] = 300,
+        connect_timeout: typing.Optional[float] = 10.0,
+        request_timeout: typing.Optional[float] = 30.0,
+    ) -> None:
+        if max_connections <= 0 or max_concurrent_requests <= 0:
+            raise ValueError("max_connections and max_concurrent_requests must be greater than 0")
+        self.max_connections = max_connections
+        self.max_concurrent_requests = max_concurrent_requests
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.connect_timeout = connect_timeout
+        self.request_timeout = request_timeout
+
+    def create_session(self) -> aiohttp.ClientSession:
+        """Return a session using a connection pool with these settings."""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+        )
+        # Only connecting is bounded here, the websocket stays open for as long as the node is up.
+        return aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=None, connect=self.connect_timeout)
+        )
+
+    @property
+    def request_timeouts(self) -> aiohttp.ClientTimeout:
+        """Timeouts of the REST requests."""
+        return aiohttp.ClientTimeout(total=self.request_timeout, connect=self.connect_timeout)
+
+
+def _guild_id(payload: _Payload) -> typing.Optional[int]:
+    guild_id = payload.get("guildId")
+    return int(guild_id) if guild_id is not None else None
+
+
+def _coalesce(batch: typing.List[_Payload]) -> typing.List[_Payload]:
+    frames: typing.List[typing.Optional[_Payload]] = []
+    last_frame: typing.Dict[typing.Any, int] = {}
+
+    for frame in batch:
+        guild_id = frame.get("guildId")
+        index = last_frame.get(guild_id)
+        if index is not None and frame.get("op") in _COALESCED_OPS:
+            previous = frames[index]
+            if previous is not None and previous.get("op") == frame["op"]:
+                frames[index] = None
+
+        last_frame[guild_id] = len(frames)
+        frames.append(frame)
+
+    return [frame for frame in frames if frame is not None]
+
 
 class Connection:
     def __init__(
@@ -30,6 +223,9 @@ class Connection:
         password: str,
         session: aiohttp.ClientSession,
         node: Node,
+        send_options: typing.Optional[SendQueueOptions] = None,
+        reconnect_options: typing.Optional[ReconnectOptions] = None,
+        max_pending_events: int = 1000,
     ) -> None:
         self.host = host
         self.port = port
@@ -40,6 +236,43 @@ class Connection:
         self._listener = None
         self.node = node
         self._conn: typing.Optional[aiohttp.ClientWebSocketResponse] = None
+        self.send_options = send_options or SendQueueOptions()
+        self._outbound: asyncio.Queue[_Payload] = asyncio.Queue(self.send_options.max_pending)
+        self._writer: typing.Optional[asyncio.Task[None]] = None
+        self.reconnect_options = reconnect_options or ReconnectOptions()
+        self.reconnects = 0
+        """Amount of times the connection was re-established after dropping."""
+        self._supervisor: typing.Optional[asyncio.Task[None]] = None
+        self._pinger: typing.Optional[asyncio.Task[None]] = None
+        self._pong: typing.Optional[asyncio.Future[None]] = None
+        self._play_sent: typing.Dict[str, float] = {}
+        self.dead_sockets = 0
+        """Times the socket was closed for not answering a ping."""
+        self._ready = asyncio.Event()
+        self._closed = False
+
+        self.handlers: typing.Dict[str, typing.Callable[[_Payload], typing.Awaitable[None]]] = {
+            "stats": self._handle_stats,
+            "playerUpdate": self._handle_player_update,
+            "event": self._handle_event,
+        }
+        """Handlers of the ops received from lavalink, by op name."""
+        self.max_pending_events = max_pending_events
+        """Events waiting on listeners above which new ones are not given to the listeners."""
+        self._undispatched = 0
+        self._pending_events: typing.Dict[int, typing.Deque[typing.Tuple[float, events.TrackEvent, bool]]] = {}
+        self._dispatchers: typing.Set[asyncio.Task[None]] = set()
+
+        self.frames_received = 0
+        """Websocket frames received from the node."""
+        self.frames_sent = 0
+        """Websocket frames sent to the node."""
+        self.player_updates_dropped = 0
+        """`playerUpdate` ops dropped without being parsed, as nobody needed them."""
+        self.events_shed = 0
+        """Track events not given to the listeners, as too many were waiting on slow ones."""
+        self.dispatch_latency = metrics.Histogram()
+        """Seconds from receiving a track event to its listeners finishing."""
 
     @property
     def headers(self) -> typing.Dict[str, str]:
@@ -47,28 +280,161 @@ class Connection:
         if not user:
             raise ComponentStateConflictError("Cannot start a connection without the bot running.")
 
-        return {
+        headers = {
             "Authorization": self.password,
             "Num-shards": str(self.app.shard_count),
             "User-Id": str(user.id),
         }
+        if self.reconnect_options.resume_timeout:
+            headers["Resume-Key"] = self.reconnect_options.resume_key
+        return headers
+
+    @property
+    def pending(self) -> int:
+        """Amount of frames waiting to be sent."""
+        return self._outbound.qsize()
 
     async def connect_node(self) -> None:
         if self.is_connected:
             raise errors.NodeAlreadyConnected(self.node.name)
 
+        resumed = await self._connect()
+        self._closed = False
+        loop = asyncio.get_event_loop()
+        self._supervisor = loop.create_task(
+            self._supervise(), name=f"Lavalink voice listener for Node::{self.node.name}"
+        )
+        self._writer = loop.create_task(self._write(), name=f"Lavalink writer for Node::{self.node.name}")
+        if self.reconnect_options.ping_interval:
+            self._pinger = loop.create_task(self._ping(), name=f"Lavalink pinger for Node::{self.node.name}")
+        self.app.dispatch(events.NodeConnectedEvent(app=self.app, node=self.node, resumed=resumed))
+
+    async def _connect(self) -> bool:
         try:
-            self._conn = await self.session.ws_connect(f"ws://{self.host}:{self.port}", headers=self.headers)
+            # Pings are answered by `_listen`, so the pongs of our own pings reach it too.
+            self._conn = await self.session.ws_connect(
+                f"ws://{self.host}:{self.port}", headers=self.headers, autoping=False
+            )
         except aiohttp.WSServerHandshakeError:
-            raise errors.AuthenticationError(f"Node::{self.node.name} Authentication Failed!")
+            raise errors.AuthenticationError(f"Node::{self.node.name}")
+
+        # aiohttp does not expose the handshake response publicly.
+        response = getattr(self._conn, "_response", None)
+        resumed = response is not None and response.headers.get("Session-Resumed") == "true"
+
+        if self.reconnect_options.resume_timeout:
+            await self._send_now(
+                {
+                    "op": "configureResuming",
+                    "key": self.reconnect_options.resume_key,
+                    "timeout": self.reconnect_options.resume_timeout,
+                }
+            )
 
         self.is_connected = True
-        loop = asyncio.get_event_loop()
-        loop.create_task(self._listen(), name=f"Lavalink voice listener for Node::{self.node.name}")
+        self.node.is_connected = True
+        self._ready.set()
+        return resumed
+
+    async def _supervise(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except Exception:
+                # Anything the listener did not expect is handled like a drop, so the node gets reconnected.
+                _LOGGER.exception("Listener of Node::%s failed", self.node.name)
+                if self._conn and not self._conn.closed:
+                    await self._conn.close()
+            if self._closed:
+                return
+
+            code = self._conn.close_code if self._conn else None
+            _LOGGER.warning("Connection to Node::%s dropped with code %s", self.node.name, code)
+            self.is_connected = False
+            self.node.is_connected = False
+            self._ready.clear()
+            self.app.dispatch(events.NodeDisconnectedEvent(app=self.app, node=self.node, code=code))
+
+            if not await self._reconnect():
+                if not self._closed:
+                    self._give_up()
+                return
+
+    async def _reconnect(self) -> bool:
+        options = self.reconnect_options
+        attempt = 0
+        while options.max_attempts is None or attempt < options.max_attempts:
+            delay = options.delay(attempt)
+            attempt += 1
+            _LOGGER.info("Reconnecting to Node::%s in %.2fs (attempt %s)", self.node.name, delay, attempt)
+            await asyncio.sleep(delay)
+            if self._closed:
+                return False
+
+            try:
+                resumed = await self._connect()
+            except (aiohttp.ClientError, OSError, asyncio.TimeoutError, errors.YouganError) as exc:
+                _LOGGER.warning("Failed to reconnect to Node::%s: %s", self.node.name, exc)
+                continue
+
+            self.reconnects += 1
+            if not resumed:
+                _LOGGER.warning("Node::%s did not resume the session, its players were lost", self.node.name)
+            self.app.dispatch(events.NodeConnectedEvent(app=self.app, node=self.node, resumed=resumed))
+            return True
+
+        _LOGGER.error("Giving up on Node::%s after %s reconnect attempts", self.node.name, attempt)
+        return False
+
+    def _give_up(self) -> None:
+        # Nothing sends the queued frames anymore, later sends raise instead of waiting for room in the queue.
+        self._closed = True
+        for task in (self._writer, self._pinger):
+            if task:
+                task.cancel()
+        self._writer = self._pinger = None
+
+        dropped = 0
+        while not self._outbound.empty():
+            self._outbound.get_nowait()
+            self._outbound.task_done()
+            dropped += 1
+        if dropped:
+            _LOGGER.warning("Dropping %s unsent frames for Node::%s", dropped, self.node.name)
+
+    async def _ping(self) -> None:
+        options = self.reconnect_options
+        assert options.ping_interval
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(options.ping_interval)
+            await self._ready.wait()
+            conn = self._conn
+            if not conn or conn.closed:
+                continue
+
+            self._pong = loop.create_future()
+            sent_at = time.perf_counter()
+            try:
+                await conn.ping()
+                await asyncio.wait_for(self._pong, options.ping_timeout)
+            except asyncio.TimeoutError:
+                # The socket looks open but nothing comes through, closing it makes the supervisor reconnect.
+                _LOGGER.warning(
+                    "Node::%s did not answer a ping in %ss, closing the socket", self.node.name, options.ping_timeout
+                )
+                self.dead_sockets += 1
+                await conn.close(code=4000, message=b"Ping timeout")
+                continue
+            except ConnectionError:
+                continue
+            finally:
+                self._pong = None
+
+            self.node.ws_latency.observe(time.perf_counter() - sent_at)
+            self.node.refresh_rank()
 
     async def connect_vc(self, session_id: str, guild_id: str, token: str, endpoint: str) -> None:
-        if not self.is_connected:
-            raise Exception(f"Node::{self.node.name} is not connected")
         _LOGGER.debug("Connecting to voice in guild %s using Node::%s", guild_id, self.node.name)
 
         await self.send(
@@ -89,63 +455,306 @@ class Connection:
             raise ComponentStateConflictError("Websocket got terminated.")
         while True:
             msg = await self._conn.receive()
-            msg = msg.json()
-            _LOGGER.debug("Receiving from %s with packet %s", self.host, msg)
-
-            if msg["op"] == "stats":
-                self.node.stats.update(msg)
+            if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED):
+                return
+            if msg.type == aiohttp.WSMsgType.ERROR:
+                _LOGGER.warning("Websocket error on Node::%s: %s", self.node.name, self._conn.exception())
+                return
+            if msg.type == aiohttp.WSMsgType.PING:
+                await self._conn.pong(msg.data)
+                continue
+            if msg.type == aiohttp.WSMsgType.PONG:
+                if self._pong and not self._pong.done():
+                    self._pong.set_result(None)
+                continue
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
 
-            player = self.node.get_player(msg["guildId"])
-            if not player:
-                # This can only be caused by the user deleting the player from node player dict.
-                _LOGGER.warning("Unknown player event recieved. Ignoring the event.")
+            self.frames_received += 1
+            # Most players are not subscribed, their position updates are dropped before being parsed.
+            if _PLAYER_UPDATE.search(msg.data) and not self._wants_player_update(msg.data):
+                self.player_updates_dropped += 1
                 continue
 
-            if msg["op"] == "event":
-                event = self.deserialise_track_events(msg, player)
-                if not event:
-                    return
-                self.app.dispatch(event)
+            try:
+                payload = self.node.codec.loads(msg.data)
+            except ValueError:
+                payload = None
+            if not isinstance(payload, dict) or "op" not in payload:
+                _LOGGER.warning("Ignoring malformed frame from Node::%s: %.200r", self.node.name, msg.data)
+                continue
 
-            if msg["op"] == "playerUpdate":
-                player._update_state(position=msg["state"]["position"], length=msg["state"]["time"])
+            _LOGGER.debug("Receiving from %s with packet %s", self.host, payload)
 
+            if tracing.observers:
+                with tracing.Span(
+                    "yougan.frame",
+                    node=self.node.name,
+                    guild_id=_guild_id(payload),
+                    attributes={"op": payload["op"]},
+                ):
+                    await self._handle_frame(payload)
             else:
-                _LOGGER.warning("Unknown op %s recieved from Node::%s", msg["op"], self.node.name)
+                await self._handle_frame(payload)
 
-    def deserialise_track_events(
-        self, payload: typing.Dict[str, str], player: Player
-    ) -> typing.Optional[events.YouganEvent]:
+    async def _handle_frame(self, payload: _Payload) -> None:
+        handler = self.handlers.get(payload["op"])
+        if not handler:
+            _LOGGER.warning("Unknown op %s recieved from Node::%s", payload["op"], self.node.name)
+            return
 
+        try:
+            await handler(payload)
+        except Exception:
+            _LOGGER.exception("Failed to handle %s op from Node::%s", payload["op"], self.node.name)
+
+    async def _handle_stats(self, payload: _Payload) -> None:
+        self.node.update_stats(payload)
+
+    def _wants_player_update(self, data: str) -> bool:
+        match = _GUILD_ID.search(data)
+        if not match:
+            return True
+        player = self.node.get_player(int(match.group(1)))
+        if not player:
+            return False
+
+        interval = player._position_interval
+        if interval is None:
+            interval = self.node.player_update_interval
+            # Without a track there is no position to correct.
+            if interval is None or player.current_track is None:
+                return False
+        return time.monotonic() - player._position_synced_at >= interval
+
+    async def _handle_player_update(self, payload: _Payload) -> None:
+        player = self.node.get_player(payload["guildId"])
+        if not player:
+            return
+        player._update_state(position=payload["state"].get("position", 0))
+        if player.is_subscribed:
+            self.app.dispatch(events.PlayerUpdateEvent(app=self.app, player=player, position=player.position))
+
+    async def _handle_event(self, payload: _Payload) -> None:
         if payload["type"] == "TrackStartEvent":
-            return events.TrackStartEvent(app=self.app, track=payload["track"], player=player)
+            sent_at = self._play_sent.pop(payload["guildId"], None)
+            if sent_at is not None:
+                self.node.play_latency.observe(time.perf_counter() - sent_at)
 
-        elif payload["type"] == "TrackEndEvent":
-            return events.TrackEndEvent(app=self.app, track=payload["track"], reason=payload["reason"], player=player)
+        player = self.node.get_player(payload["guildId"])
+        if not player:
+            # This can only be caused by the user deleting the player from node player dict.
+            _LOGGER.warning("Unknown player event recieved. Ignoring the event.")
+            return
 
-        elif payload["type"] == "TrackStuckEvent":
-            return events.TrackStuckEvent(
-                app=self.app, track=payload["track"], threshold=int(payload["thresholdMs"]), player=player
-            )
+        if payload["type"] == "TrackStartEvent":
+            # The first update of a track is always applied, it accounts for the time spent loading it.
+            player._position_synced_at = float("-inf")
 
-        elif payload["type"] == "TrackExceptionEvent":
-            return events.TrackExceptionEvent(
-                app=self.app, track=payload["track"], error=payload["error"], player=player
-            )
-        else:
-            _LOGGER.warning("Unknown track event received. Ignoring.")
+        event = self.deserialise_track_events(payload, player)
+        if event:
+            self._queue_dispatch(int(player.guild_id), event)
+
+    def deserialise_track_events(
+        self, payload: typing.Dict[str, typing.Any], player: Player
+    ) -> typing.Optional[events.TrackEvent]:
+        builder = _TRACK_EVENTS.get(payload["type"])
+        if not builder:
+            _LOGGER.warning("Unknown track event %s received. Ignoring.", payload["type"])
             return None
+        return builder(self.app, payload, player)
+
+    def _queue_dispatch(self, guild_id: int, event: events.TrackEvent) -> None:
+        # Never waits, the read loop has to keep answering pings. Once too many events are waiting on slow
+        # listeners, new ones skip the listeners but still advance the queue of their player.
+        notify = self._undispatched < self.max_pending_events
+        if notify:
+            self._undispatched += 1
+        else:
+            if not self.events_shed:
+                _LOGGER.warning(
+                    "Over %s events are waiting on listeners of Node::%s, new ones are not dispatched",
+                    self.max_pending_events,
+                    self.node.name,
+                )
+            self.events_shed += 1
+
+        pending = self._pending_events.get(guild_id)
+        if pending is None:
+            pending = self._pending_events[guild_id] = collections.deque()
+            # The loop only keeps weak references to tasks.
+            task = asyncio.get_running_loop().create_task(
+                self._dispatch_guild(guild_id, pending), name=f"Event dispatcher for guild {guild_id}"
+            )
+            self._dispatchers.add(task)
+            task.add_done_callback(self._dispatchers.discard)
+        pending.append((time.perf_counter(), event, notify))
+
+    async def _dispatch_guild(
+        self, guild_id: int, pending: typing.Deque[typing.Tuple[float, events.TrackEvent, bool]]
+    ) -> None:
+        # Events of a guild are dispatched one after the other, other guilds get their own task.
+        try:
+            while pending:
+                received_at, event, notify = pending.popleft()
+                if notify:
+                    try:
+                        if tracing.observers:
+                            with tracing.Span(
+                                "yougan.dispatch",
+                                node=self.node.name,
+                                guild_id=guild_id,
+                                attributes={"event": type(event).__name__},
+                            ):
+                                await self._dispatch(event)
+                        else:
+                            await self._dispatch(event)
+                    except Exception:
+                        _LOGGER.exception("Failed to dispatch %s for guild %s", type(event).__name__, guild_id)
+                    finally:
+                        self._undispatched -= 1
+                        self.dispatch_latency.observe(time.perf_counter() - received_at)
+
+                # The queue advances once the listeners have seen the end of the previous track.
+                try:
+                    await event.player._handle_track_event(event)
+                except Exception:
+                    _LOGGER.exception("Failed to advance the queue of guild %s", guild_id)
+        finally:
+            del self._pending_events[guild_id]
+
+    async def _dispatch(self, event: events.YouganEvent) -> None:
+        # hikari only hands back the listener tasks when asked to, they are awaited to keep the events in order.
+        listeners = self.app.dispatch(event, return_tasks=True)
+        if listeners is not None:
+            await listeners
 
     async def send(self, payload: typing.Dict[str, typing.Any]) -> None:
+        """Queue a frame to be sent by the writer task.
+
+        Waits for room in the queue when it is full, unless the connection is
+        configured to fail fast. Frames sent while the connection is being
+        re-established are kept in the queue until it is back up.
+        """
+        if tracing.observers:
+            with tracing.Span(
+                "yougan.send", node=self.node.name, guild_id=_guild_id(payload), attributes={"op": payload.get("op")}
+            ):
+                await self._enqueue(payload)
+        else:
+            await self._enqueue(payload)
+
+    async def send_many(self, payloads: typing.Sequence[_Payload]) -> typing.List[typing.Optional[Exception]]:
+        """Queue several frames to be sent by the writer task in a single batch.
+
+        Frames are queued without yielding to the event loop while there is
+        room in the queue, so the writer picks them up together.
+
+        Returns
+        -------
+        typing.List[typing.Optional[builtins.Exception]]
+            For every frame, the error which kept it from being queued, or `None`.
+        """
+        if tracing.observers:
+            with tracing.Span("yougan.send_many", node=self.node.name, attributes={"frames": len(payloads)}):
+                return await self._enqueue_many(payloads)
+        return await self._enqueue_many(payloads)
+
+    async def _enqueue_many(self, payloads: typing.Sequence[_Payload]) -> typing.List[typing.Optional[Exception]]:
+        if self._closed or not self._conn:
+            raise ComponentStateConflictError("Websocket got terminated.")
+
+        results: typing.List[typing.Optional[Exception]] = []
+        for payload in payloads:
+            try:
+                self._outbound.put_nowait(payload)
+            except asyncio.QueueFull:
+                if self.send_options.fail_fast:
+                    results.append(errors.SendQueueFull(self.node.name))
+                    continue
+                await self._outbound.put(payload)
+                if self._closed:
+                    raise ComponentStateConflictError("Websocket got terminated.")
+            results.append(None)
+        return results
+
+    async def _enqueue(self, payload: typing.Dict[str, typing.Any]) -> None:
+        if self._closed or not self._conn:
+            raise ComponentStateConflictError("Websocket got terminated.")
+
+        if self.send_options.fail_fast:
+            try:
+                self._outbound.put_nowait(payload)
+            except asyncio.QueueFull:
+                raise errors.SendQueueFull(self.node.name) from None
+        else:
+            await self._outbound.put(payload)
+            if self._closed:
+                # Room was made by giving up on the node, the frame will never be sent.
+                raise ComponentStateConflictError("Websocket got terminated.")
+
+    async def flush(self) -> None:
+        """Wait until every queued frame has been sent."""
+        if self._writer and not self._writer.done():
+            await self._outbound.join()
+
+    async def _write(self) -> None:
+        while True:
+            batch = [await self._outbound.get()]
+            if self.send_options.coalesce_window:
+                await asyncio.sleep(self.send_options.coalesce_window)
+            while not self._outbound.empty():
+                batch.append(self._outbound.get_nowait())
+
+            try:
+                for payload in _coalesce(batch):
+                    await self._ready.wait()
+                    try:
+                        await self._send_now(payload)
+                    except ConnectionError:
+                        # The socket dropped, hold the frame until the supervisor reconnects.
+                        self._ready.clear()
+                        await self._ready.wait()
+                        await self._send_now(payload)
+            except Exception:
+                _LOGGER.exception("Failed to send %s frames to Node::%s", len(batch), self.node.name)
+            finally:
+                for _ in batch:
+                    self._outbound.task_done()
+
+    async def _send_now(self, payload: typing.Dict[str, typing.Any]) -> None:
         if not self._conn:
             raise ComponentStateConflictError("Websocket got terminated.")
 
         _LOGGER.debug("Sending %s with packet %s", self.host, payload)
-        await self._conn.send_str(json.dumps(payload))
+        await self._conn.send_str(self.node.codec.dumps(payload))
+        self.frames_sent += 1
+        if payload.get("op") == "play":
+            self._play_sent[payload["guildId"]] = time.perf_counter()
 
-    async def close(self) -> None:
-        if not self._conn:
+    async def close(self, *, timeout: typing.Optional[float] = 5.0) -> None:
+        """Send the queued frames and close the websocket.
+
+        Parameters
+        ----------
+        timeout: typing.Optional[builtins.float]
+            Seconds to wait for the queue to drain before closing anyway.
+        """
+        if not self._conn or self._closed:
             return
 
+        # A batch already taken by the writer is not counted by `pending` but still waited on here.
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            _LOGGER.warning("Dropping %s unsent frames for Node::%s", self.pending, self.node.name)
+
+        self._closed = True
+        for task in (self._writer, self._supervisor, self._pinger, *self._dispatchers):
+            if task:
+                task.cancel()
+        self._writer = self._supervisor = self._pinger = None
+
         await self._conn.close(code=1006)
         self.is_connected = False
+        self._ready.clear()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import struct
+import typing
+
+from yougan import errors
+from yougan import models
+
+__all__: typing.Tuple[str, ...] = ("decode_track", "SUPPORTED_VERSIONS")
+
+SUPPORTED_VERSIONS: typing.FrozenSet[int] = frozenset((1, 2, 3))
+"""Track message versions which can be decoded locally."""
+
+_TRACK_INFO_VERSIONED = 1
+
+_INT = struct.Struct(">i")
+_USHORT = struct.Struct(">H")
+_LONG = struct.Struct(">q")
+
+
+class _DataReader:
+    """Reads values written by java's `DataOutput`."""
+
+    __slots__ = ("_buffer", "_offset")
+
+    def __init__(self, buffer: bytes) -> None:
+        self._buffer = buffer
+        self._offset = 0
+
+    @property
+    def offset(self) -> int:
+        return self._offset
+
+    def _read(self, size: int) -> bytes:
+        end = self._offset + size
+        if end > len(self._buffer):
+            raise errors.TrackDecodeError("Track message ended unexpectedly")
+        data = self._buffer[self._offset : end]
+        self._offset = end
+        return data
+
+    def read_byte(self) -> int:
+        return self._read(1)[0]
+
+    def read_bool(self) -> bool:
+        return self.read_byte() != 0
+
+    def read_int(self) -> int:
+        value: int = _INT.unpack(self._read(4))[0]
+        return value
+
+    def read_long(self) -> int:
+        value: int = _LONG.unpack(self._read(8))[0]
+        return value
+
+    def read_utf(self) -> str:
+        (size,) = _USHORT.unpack(self._read(2))
+        return _decode_modified_utf8(self._read(size))
+
+    def read_nullable_utf(self) -> typing.Optional[str]:
+        return self.read_utf() if self.read_bool() else None
+
+
+def _decode_modified_utf8(data: bytes) -> str:
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+
+    # Java encodes NUL as two bytes and supplementary characters as surrogate pairs.
+    try:
+        text = data.replace(b"\xc0\x80", b"\x00").decode("utf-8", "surrogatepass")
+        return text.encode("utf-16", "surrogatepass").decode("utf-16")
+    except UnicodeError as exc:
+        raise errors.TrackDecodeError("Track message contains invalid text") from exc
+
+
+def decode_track(track_id: str) -> models.Track:
+    """Decode a base64 track identifier given by lavalink without contacting the node.
+
+    Parameters
+    ----------
+    track_id: builtins.str
+        The base64 track identifier.
+
+    Returns
+    -------
+    yougan.models.Track
+        The decoded track.
+
+    Raises
+    ------
+    yougan.errors.TrackDecodeError
+        If the identifier is malformed or its message version is not supported.
+    """
+    track = models.Track.get_interned(track_id)
+    if track is not None:
+        return track
+
+    try:
+        buffer = base64.b64decode(track_id, validate=True)
+    except (binascii.Error, ValueError) as exc:
+        raise errors.TrackDecodeError("Track identifier is not valid base64") from exc
+
+    reader = _DataReader(buffer)
+    header = reader.read_int()
+    flags = (header & 0xC0000000) >> 30
+    size = header & 0x3FFFFFFF
+    if size + 4 > len(buffer):
+        raise errors.TrackDecodeError("Track message is shorter than its header")
+
+    version = reader.read_byte() if flags & _TRACK_INFO_VERSIONED else 1
+    if version not in SUPPORTED_VERSIONS:
+        raise errors.TrackDecodeError(f"Unsupported track message version {version}")
+
+    title = reader.read_utf()
+    author = reader.read_utf()
+    length = reader.read_long()
+    identifier = reader.read_utf()
+    is_stream = reader.read_bool()
+    uri = reader.read_nullable_utf() if version >= 2 else None
+    # Source specific fields follow, the position is always the last field of the message.
+    position_offset = 4 + size - 8
+    if position_offset < reader.offset:
+        raise errors.TrackDecodeError("Track message is shorter than its fields")
+    (position,) = _LONG.unpack_from(buffer, position_offset)
+
+    track = models.Track(
+        track_id,
+        title=title,
+        author=author,
+        length=length,
+        position=position,
+        uri=uri or "",
+        ytid=identifier,
+        is_stream=is_stream,
+        is_seekable=not is_stream,
+    )
+    return models.Track.intern(track)
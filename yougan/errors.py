@@ -1,4 +1,4 @@
-__all__ = ("YouganError", "AuthenticationError", "TrackLoadError")
+__all__ = ("YouganError", "AuthenticationError", "TrackLoadError", "TrackDecodeError", "SendQueueFull")
 
 
 class YouganError(RuntimeError):
@@ -10,6 +10,10 @@ class AuthenticationError(YouganError):
 
     node: str
 
+    def __init__(self, node: str) -> None:
+        super().__init__(node)
+        self.node = node
+
     def __str__(self) -> str:
         return f"Invalid password provided for {self.node}"
 
@@ -19,6 +23,10 @@ class NodeAlreadyConnected(YouganError):
 
     node: str
 
+    def __init__(self, node: str) -> None:
+        super().__init__(node)
+        self.node = node
+
     def __str__(self) -> str:
         return f"Node::{self.node} is already connected"
 
@@ -28,5 +36,26 @@ class TrackLoadError(YouganError):
 
     error: str
 
+    def __init__(self, error: str) -> None:
+        super().__init__(error)
+        self.error = error
+
     def __str__(self) -> str:
         return f"Track loading failed due to: {self.error}"
+
+
+class TrackDecodeError(YouganError):
+    """Raised when a track identifier cannot be decoded locally."""
+
+
+class SendQueueFull(YouganError):
+    """Raised when the outbound queue of a node is full and the node is set to fail fast."""
+
+    node: str
+
+    def __init__(self, node: str) -> None:
+        super().__init__(node)
+        self.node = node
+
+    def __str__(self) -> str:
+        return f"Outbound queue of Node::{self.node} is full"
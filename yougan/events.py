@@ -1,28 +1,28 @@
 from __future__ import annotations
 import typing
 
+import attr
 from hikari.events import Event
-from dataclasses import dataclass
 
 if typing.TYPE_CHECKING:
     from hikari import traits
+    from yougan.node import Node
     from yougan.player import Player
 
 
 class YouganEvent(Event):
-    @property
-    def app(self) -> traits.RESTAware:
-        return self.app
+    # `app` is provided as a field by the subclasses.
+    __slots__: typing.Sequence[str] = ()
 
 
-@dataclass
+@attr.define(kw_only=True, weakref_slot=False)
 class TrackStartEvent(YouganEvent):
     track: str
     player: Player
     app: traits.RESTAware
 
 
-@dataclass
+@attr.define(kw_only=True, weakref_slot=False)
 class TrackEndEvent(YouganEvent):
     track: str
     player: Player
@@ -30,7 +30,7 @@ class TrackEndEvent(YouganEvent):
     app: traits.RESTAware
 
 
-@dataclass
+@attr.define(kw_only=True, weakref_slot=False)
 class TrackStuckEvent(YouganEvent):
     track: str
     threshold: int
@@ -38,9 +38,34 @@ class TrackStuckEvent(YouganEvent):
     app: traits.RESTAware
 
 
-@dataclass
+@attr.define(kw_only=True, weakref_slot=False)
 class TrackExceptionEvent(YouganEvent):
     track: str
     error: str
     player: Player
     app: traits.RESTAware
+
+
+TrackEvent = typing.Union[TrackStartEvent, TrackEndEvent, TrackStuckEvent, TrackExceptionEvent]
+"""Events about the track of a player, dispatched in order for each guild."""
+
+
+@attr.define(kw_only=True, weakref_slot=False)
+class PlayerUpdateEvent(YouganEvent):
+    position: int
+    player: Player
+    app: traits.RESTAware
+
+
+@attr.define(kw_only=True, weakref_slot=False)
+class NodeConnectedEvent(YouganEvent):
+    node: Node
+    resumed: bool
+    app: traits.RESTAware
+
+
+@attr.define(kw_only=True, weakref_slot=False)
+class NodeDisconnectedEvent(YouganEvent):
+    node: Node
+    code: typing.Optional[int]
+    app: traits.RESTAware
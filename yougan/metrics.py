@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import typing
+
+if typing.TYPE_CHECKING:
+    from aiohttp import web
+
+    from yougan.client import Client
+
+__all__: typing.Tuple[str, ...] = ("Histogram", "MetricsExporter")
+
+_LOGGER = logging.getLogger("yougan")
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+DEFAULT_BUCKETS: typing.Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Upper bounds, in seconds, of the latency histogram buckets."""
+
+
+class Histogram:
+    """A latency histogram with fixed buckets.
+
+    Observing a value is a binary search and two additions, so histograms are
+    always kept up to date and only rendered when scraped.
+
+    Parameters
+    ----------
+    buckets: typing.Sequence[builtins.float]
+        Sorted upper bounds of the buckets.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> typing.Iterator[typing.Tuple[str, int]]:
+        """Yield the `le` label and cumulative count of every bucket, ending with `+Inf`."""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield repr(float(bound)), total
+        yield "+Inf", self.count
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Writer:
+    __slots__ = ("lines",)
+
+    def __init__(self) -> None:
+        self.lines: typing.List[str] = []
+
+    def family(self, name: str, kind: str, help: str) -> None:
+        self.lines.append(f"# TYPE {name} {kind}")
+        self.lines.append(f"# HELP {name} {help}")
+
+    def sample(self, name: str, node: str, value: float, **labels: str) -> None:
+        label = f'node="{_escape(node)}"'
+        for key, label_value in labels.items():
+            label += f',{key}="{label_value}"'
+        self.lines.append(f"{name}{{{label}}} {value}")
+
+    def histogram(self, name: str, node: str, histogram: Histogram) -> None:
+        for bound, count in histogram.cumulative():
+            self.sample(f"{name}_bucket", node, count, le=bound)
+        self.sample(f"{name}_count", node, histogram.count)
+        self.sample(f"{name}_sum", node, histogram.sum)
+
+
+_STATS_GAUGES: typing.Tuple[typing.Tuple[str, str, str], ...] = (
+    ("players", "yougan_node_lavalink_players", "Players reported by lavalink."),
+    ("active_players", "yougan_node_lavalink_playing_players", "Playing players reported by lavalink."),
+    ("used_memory", "yougan_node_memory_used_bytes", "Memory used by lavalink."),
+    ("free_memory", "yougan_node_memory_free_bytes", "Memory free in lavalink."),
+    ("allocated_memory", "yougan_node_memory_allocated_bytes", "Memory allocated by lavalink."),
+    ("reservable_memory", "yougan_node_memory_reservable_bytes", "Memory reservable by lavalink."),
+    ("cores", "yougan_node_cpu_cores", "CPU cores of the lavalink host."),
+    ("system_load", "yougan_node_system_load", "System CPU load of the lavalink host."),
+    ("lavalink_load", "yougan_node_lavalink_load", "CPU load of lavalink."),
+    ("uptime", "yougan_node_uptime_milliseconds", "Uptime of lavalink."),
+    ("frames_sent", "yougan_node_frames_sent", "Average frames sent per minute."),
+    ("frames_nulled", "yougan_node_frames_nulled", "Average frames nulled per minute."),
+    ("frames_deficit", "yougan_node_frames_deficit", "Average frame deficit per minute."),
+)
+
+
+class MetricsExporter:
+    """Exposes the state of the nodes of a client in the OpenMetrics text format.
+
+    Metrics are read from the counters the nodes already keep, nothing is
+    collected until the exporter is scraped.
+
+    Parameters
+    ----------
+    client: yougan.client.Client
+        The client whose nodes are exported.
+    """
+
+    def __init__(self, client: Client) -> None:
+        self.client = client
+        self._runner: typing.Optional[web.AppRunner] = None
+
+    def __call__(self) -> str:
+        return self.render()
+
+    def render(self) -> str:
+        """Return the metrics of every node in the OpenMetrics text format."""
+        writer = _Writer()
+        nodes = list(self.client.nodes.values())
+
+        for attribute, name, help in _STATS_GAUGES:
+            writer.family(name, "gauge", help)
+            for node in nodes:
+                writer.sample(name, node.name, getattr(node.stats, attribute))
+
+        writer.family("yougan_node_connected", "gauge", "Whether the websocket of the node is connected.")
+        for node in nodes:
+            writer.sample("yougan_node_connected", node.name, int(node.is_connected))
+
+        writer.family("yougan_node_players", "gauge", "Players connected through the node.")
+        for node in nodes:
+            writer.sample("yougan_node_players", node.name, len(node.players))
+
+        connected = [(node, node.connection) for node in nodes if node.connection]
+
+        writer.family("yougan_websocket_frames_received", "counter", "Websocket frames received from the node.")
+        for node, connection in connected:
+            writer.sample("yougan_websocket_frames_received_total", node.name, connection.frames_received)
+
+        writer.family("yougan_websocket_frames_sent", "counter", "Websocket frames sent to the node.")
+        for node, connection in connected:
+            writer.sample("yougan_websocket_frames_sent_total", node.name, connection.frames_sent)
+
+        writer.family("yougan_websocket_reconnects", "counter", "Times the websocket was re-established.")
+        for node, connection in connected:
+            writer.sample("yougan_websocket_reconnects_total", node.name, connection.reconnects)
+
+        writer.family(
+            "yougan_player_updates_dropped", "counter", "playerUpdate ops dropped as no subscriber needed them."
+        )
+        for node, connection in connected:
+            writer.sample("yougan_player_updates_dropped_total", node.name, connection.player_updates_dropped)
+
+        writer.family("yougan_events_shed", "counter", "Track events not dispatched as listeners were too slow.")
+        for node, connection in connected:
+            writer.sample("yougan_events_shed_total", node.name, connection.events_shed)
+
+        writer.family("yougan_send_queue_depth", "gauge", "Frames waiting to be sent to the node.")
+        for node, connection in connected:
+            writer.sample("yougan_send_queue_depth", node.name, connection.pending)
+
+        writer.family("yougan_websocket_dead_sockets", "counter", "Times the websocket was closed for missing a pong.")
+        for node, connection in connected:
+            writer.sample("yougan_websocket_dead_sockets_total", node.name, connection.dead_sockets)
+
+        writer.family("yougan_websocket_rtt_seconds", "gauge", "Smoothed round trip time of the websocket pings.")
+        for node in nodes:
+            if node.ws_latency.smoothed is not None:
+                writer.sample("yougan_websocket_rtt_seconds", node.name, node.ws_latency.smoothed)
+
+        writer.family("yougan_play_latency_seconds", "gauge", "Smoothed time from a play op to its track starting.")
+        for node in nodes:
+            if node.play_latency.smoothed is not None:
+                writer.sample("yougan_play_latency_seconds", node.name, node.play_latency.smoothed)
+
+        writer.family("yougan_http_requests_in_flight", "gauge", "REST requests currently made to the node.")
+        for node in nodes:
+            writer.sample("yougan_http_requests_in_flight", node.name, node.requests_in_flight)
+
+        writer.family("yougan_http_requests_waiting", "gauge", "REST requests waiting for the request limiter.")
+        for node in nodes:
+            writer.sample("yougan_http_requests_waiting", node.name, node.requests_waiting)
+
+        writer.family("yougan_http_connections", "gauge", "Sockets of the connection pool of the node.")
+        for node in nodes:
+            writer.sample("yougan_http_connections", node.name, node.connections_in_use, state="in_use")
+            writer.sample("yougan_http_connections", node.name, node.connections_idle, state="idle")
+
+        writer.family("yougan_http_connections_limit", "gauge", "Maximum sockets of the connection pool of the node.")
+        for node in nodes:
+            writer.sample("yougan_http_connections_limit", node.name, node.http_options.max_connections)
+
+        writer.family(
+            "yougan_loadtracks_latency_seconds", "histogram", "Latency of the /loadtracks requests made to the node."
+        )
+        for node in nodes:
+            writer.histogram("yougan_loadtracks_latency_seconds", node.name, node.loadtracks_latency)
+
+        writer.family(
+            "yougan_dispatch_latency_seconds",
+            "histogram",
+            "Time from receiving a track event to its listeners finishing.",
+        )
+        for node, connection in connected:
+            writer.histogram("yougan_dispatch_latency_seconds", node.name, connection.dispatch_latency)
+
+        writer.lines.append("# EOF")
+        return "\n".join(writer.lines) + "\n"
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """aiohttp handler serving the metrics, to mount in an existing application."""
+        from aiohttp import web
+
+        return web.Response(body=self.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 9464, *, path: str = "/metrics") -> None:
+        """Serve the metrics over HTTP.
+
+        Parameters
+        ----------
+        host: builtins.str
+            The address to listen on. Only the local host by default.
+        port: builtins.int
+            The port to listen on.
+        path: builtins.str
+            The path the metrics are served at.
+        """
+        from aiohttp import web
+
+        if self._runner:
+            raise RuntimeError("The metrics exporter is already running")
+
+        app = web.Application()
+        app.router.add_get(path, self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        _LOGGER.info("Serving metrics on http://%s:%s%s", host, port, path)
+
+    async def stop(self) -> None:
+        """Stop serving the metrics."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
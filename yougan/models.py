@@ -1,9 +1,25 @@
 import typing
+import weakref
 
-__all__: typing.Tuple[str, ...] = ("Track", "SearchResult", "YTPlaylist")
+__all__: typing.Tuple[str, ...] = ("Track", "TrackSequence", "SearchResult", "YTPlaylist")
+
+_interned_tracks: "weakref.WeakValueDictionary[str, Track]" = weakref.WeakValueDictionary()
 
 
 class Track:
+    __slots__ = (
+        "id",
+        "author",
+        "title",
+        "length",
+        "position",
+        "uri",
+        "ytid",
+        "is_stream",
+        "is_seekable",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         id: str,
@@ -30,7 +46,9 @@ class Track:
         """Total length of the track."""
 
         self.position = position
-        """Current position of the player on this track."""
+        """Position the track starts at.
+
+        The current position of a player is given by `yougan.player.Player.position`."""
 
         self.uri = uri
         """URI of the track."""
@@ -52,10 +70,31 @@ class Track:
             return f"https://img.youtube.com/vi/{self.ytid}/mqdefault.jpg"
         return None
 
+    @classmethod
+    def intern(cls, track: "Track") -> "Track":
+        """Return the live track with the same identifier, registering this one if there is none.
+
+        This lets every player that queued the same song share one object.
+        """
+        existing = _interned_tracks.get(track.id)
+        if existing is not None:
+            return existing
+        _interned_tracks[track.id] = track
+        return track
+
+    @classmethod
+    def get_interned(cls, track_id: str) -> typing.Optional["Track"]:
+        """Return the live track with the given identifier, if any."""
+        return _interned_tracks.get(track_id)
+
     @classmethod
     def from_dict(cls, payload: typing.Dict[str, typing.Any]) -> "Track":
+        existing = _interned_tracks.get(payload["track"])
+        if existing is not None and type(existing) is cls:
+            return existing
+
         info: typing.Dict[str, str] = payload["info"]
-        return cls(
+        track = cls(
             payload["track"],  # base64 track identifier provided by lavalink
             author=info["author"],
             title=info["title"],
@@ -66,18 +105,62 @@ class Track:
             is_stream=bool(info["isStream"]),
             is_seekable=bool(info["isSeekable"]),
         )
+        return cls.intern(track)
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Track):
-            raise TypeError(f"Expected {other} to type Track but got {type(other)}")
+            return NotImplemented
         return self.id == other.id
 
     def __hash__(self) -> int:
         return hash(self.id)
 
 
+class TrackSequence(typing.Sequence[Track]):
+    """Tracks of a lavalink response, built only when they are accessed.
+
+    Parameters
+    ----------
+    payloads: typing.Sequence[typing.Dict[builtins.str, typing.Any]]
+        The raw track objects returned by lavalink.
+    """
+
+    __slots__ = ("_payloads", "_tracks")
+
+    def __init__(self, payloads: typing.Sequence[typing.Dict[str, typing.Any]]) -> None:
+        self._payloads = payloads
+        self._tracks: typing.List[typing.Optional[Track]] = [None] * len(payloads)
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    @typing.overload
+    def __getitem__(self, index: int) -> Track: ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> typing.List[Track]: ...
+
+    def __getitem__(self, index: typing.Union[int, slice]) -> typing.Union[Track, typing.List[Track]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        track = self._tracks[index]
+        if track is None:
+            track = self._tracks[index] = Track.from_dict(self._payloads[index])
+        return track
+
+    def __iter__(self) -> typing.Iterator[Track]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f"TrackSequence(<{len(self)} tracks>)"
+
+
 class SearchResult:
-    def __init__(self, *, tracks: typing.Iterable[Track], query: str):
+    __slots__ = ("tracks", "query")
+
+    def __init__(self, *, tracks: typing.Sequence[Track], query: str):
         self.tracks = tracks
         """Tracks returned by the query."""
 
@@ -86,7 +169,9 @@ class SearchResult:
 
 
 class YTPlaylist:
-    def __init__(self, *, name: str, tracks: typing.List[Track], selected_track: int):
+    __slots__ = ("name", "tracks", "selected_track")
+
+    def __init__(self, *, name: str, tracks: typing.Sequence[Track], selected_track: int):
         self.name = name
         """Name of the youtube playlist."""
 
@@ -1,11 +1,15 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+import asyncio
+import contextlib
 import logging
+import time
 import typing
 
-from yougan.connection import Connection
-from yougan import stats, models, errors
+from yougan.connection import Connection, HTTPOptions, ReconnectOptions, SendQueueOptions
+from yougan.stats import LatencyTracker
+from yougan import stats, models, errors, balancing, cache, codec, decoder, metrics, tracing
 
 if typing.TYPE_CHECKING:
     import aiohttp
@@ -26,17 +30,92 @@ class Node:
     port: int
     password: str
     app: impl.GatewayBot
-    session: aiohttp.ClientSession
+    session: typing.Optional[aiohttp.ClientSession] = None
+    """Session used to talk to the node. A dedicated one is created from `http_options` if not given."""
 
-    stats = stats.Stats()
+    stats: stats.Stats = field(default_factory=stats.Stats)
     is_connected = False
     connection: typing.Optional[Connection] = None
-    players: typing.Dict[int, Player] = {}
+    players: typing.Dict[int, Player] = field(default_factory=dict)
+    ranking: typing.Optional[balancing.NodeRanking] = None
+    search_cache: typing.Optional[cache.SearchCache] = None
+    disk_cache: typing.Optional[cache.DiskCache] = None
+    codec: codec.JSONCodec = field(default_factory=codec.default_codec)
+    send_options: typing.Optional[SendQueueOptions] = None
+    reconnect_options: typing.Optional[ReconnectOptions] = None
+    max_pending_events: int = 1000
+    player_update_interval: typing.Optional[float] = 30.0
+    """Minimum seconds between two `playerUpdate` ops applied to a player which is not subscribed.
+
+    Applied updates correct the drift of `Player.position`, the first one after a track starts always is.
+    They are all dropped if `None`, the position is then only moved forward from the last play, seek or pause.
+    """
+    supports_bulk_decode: bool = field(default=True, init=False)
+    draining: bool = field(default=False, init=False)
+    """Whether new players are kept off this node."""
+    loadtracks_latency: metrics.Histogram = field(default_factory=metrics.Histogram, init=False)
+    """Seconds taken by the `/loadtracks` requests made to this node."""
+    ws_latency: LatencyTracker = field(default_factory=LatencyTracker, init=False)
+    """Round trip times of the websocket pings, in seconds."""
+    play_latency: LatencyTracker = field(default_factory=LatencyTracker, init=False)
+    """Seconds from sending a `play` op to receiving its `TrackStartEvent`."""
+    http_options: HTTPOptions = field(default_factory=HTTPOptions)
+    regions: typing.FrozenSet[str] = field(default_factory=frozenset)
+    """Regions or voice server locations this node is close to, such as `eu` or `rotterdam`."""
+    requests_in_flight: int = field(default=0, init=False)
+    """REST requests currently being made to this node."""
+    requests_waiting: int = field(default=0, init=False)
+    """REST requests waiting for a slot because `HTTPOptions.max_concurrent_requests` was reached."""
+    _limiter: typing.Optional[asyncio.Semaphore] = field(default=None, init=False, repr=False)
+    _owns_session: bool = field(default=False, init=False, repr=False)
 
     @property
     def headers(self) -> typing.Dict[str, str]:
         return {"Authorization": self.password, "Accept": "application/json"}
 
+    @property
+    def connections_in_use(self) -> int:
+        """Sockets of the connection pool currently in use, the websocket included."""
+        connector = self.session.connector if self.session else None
+        return len(getattr(connector, "_acquired", ()))
+
+    @property
+    def connections_idle(self) -> int:
+        """Sockets of the connection pool kept open for reuse."""
+        connector = self.session.connector if self.session else None
+        return sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+
+    def _http(self) -> aiohttp.ClientSession:
+        if self.session is None or (self._owns_session and self.session.closed):
+            self.session = self.http_options.create_session()
+            self._owns_session = True
+        return self.session
+
+    @contextlib.asynccontextmanager
+    async def _request(
+        self, method: str, path: str, **kwargs: typing.Any
+    ) -> typing.AsyncIterator[aiohttp.ClientResponse]:
+        # Bounds the requests made at once, so bursts queue here instead of opening more sockets.
+        if self._limiter is None:
+            self._limiter = asyncio.Semaphore(self.http_options.max_concurrent_requests)
+
+        self.requests_waiting += 1
+        try:
+            await self._limiter.acquire()
+        finally:
+            self.requests_waiting -= 1
+
+        self.requests_in_flight += 1
+        try:
+            kwargs.setdefault("headers", self.headers)
+            async with self._http().request(
+                method, f"http://{self.host}:{self.port}{path}", timeout=self.http_options.request_timeouts, **kwargs
+            ) as resp:
+                yield resp
+        finally:
+            self.requests_in_flight -= 1
+            self._limiter.release()
+
     def get_player(self, guild: snowflakes.SnowflakeishOr[guilds.Guild]) -> typing.Optional[Player]:
         """Get the player which is active in a specific guild
 
@@ -55,6 +134,22 @@ class Node:
         except KeyError:
             return None
 
+    def update_stats(self, payload: typing.Dict[str, typing.Any]) -> None:
+        """Update the node stats and its position in the node ranking.
+
+        Parameters
+        ----------
+        payload: typing.Dict[str, typing.Any]
+            The `stats` op received from lavalink.
+        """
+        self.stats.update(payload)
+        self.refresh_rank()
+
+    def refresh_rank(self) -> None:
+        """Re-score this node in the ranking it belongs to."""
+        if self.ranking is not None:
+            self.ranking.update(self)
+
     async def search_tracks(
         self,
         query: str,
@@ -87,6 +182,14 @@ class Node:
             Returns the result of the query.
 
         """
+        if tracing.observers:
+            with tracing.Span("yougan.search_tracks", node=self.name, attributes={"query": query}):
+                return await self._search_tracks(query, yt=yt, sc=sc)
+        return await self._search_tracks(query, yt=yt, sc=sc)
+
+    async def _search_tracks(
+        self, query: str, *, yt: typing.Optional[bool], sc: typing.Optional[bool]
+    ) -> typing.Union[models.SearchResult, models.YTPlaylist, models.Track]:
         _LOGGER.debug("Querying for %s in Node::%s", query, self.name)
 
         if yt:
@@ -94,64 +197,230 @@ class Node:
         elif sc:
             query = f"scsearch:{query}"
 
-        params = {"identifier": query}
+        if self.search_cache is not None:
+            payload = await self.search_cache.get_or_load(query, self._load_tracks)
+        else:
+            payload = await self._load_tracks(query)
 
-        async with self.session.get(
-            f"http://{self.host}:{self.port}/loadtracks",
-            headers=self.headers,
-            params=params,
-        ) as resp:
-            payload = await resp.json()
-            if payload.get("error", None):
-                raise errors.TrackLoadError(f"{payload['error']}: {payload['message']}")
+        if payload["loadType"] == "SEARCH_RESULT":
+            return models.SearchResult(tracks=models.TrackSequence(payload["tracks"]), query=query)
+
+        elif payload["loadType"] == "TRACK_LOADED":
+            return models.Track.from_dict(payload["tracks"][0])
+
+        elif payload["loadType"] == "PLAYLIST_LOADED":
+            info = payload["playlistInfo"]
+            return models.YTPlaylist(
+                name=info["name"],
+                tracks=models.TrackSequence(payload["tracks"]),
+                selected_track=info["selectedTrack"],
+            )
+
+        elif payload["loadType"] == "LOAD_FAILED":
+            exception = payload["exception"]
+            raise errors.TrackLoadError(f'{exception["severity"]}: {exception["message"]}')
 
-            if payload["loadType"] == "SEARCH_RESULT":
-                tracks = [models.Track.from_dict(track) for track in payload["tracks"]]
-                return models.SearchResult(tracks=tracks, query=query)
+        raise ValueError(f"Recieved unknown response: {payload}")
 
-            elif payload["loadType"] == "TRACK_LOADED":
-                return models.Track.from_dict(payload["tracks"][0])
+    async def _load_tracks(self, identifier: str) -> typing.Dict[str, typing.Any]:
+        if self.disk_cache is not None:
+            cached = await self.disk_cache.get_result(identifier)
+            if cached is not None:
+                return cached
 
-            elif payload["loadType"] == "PLAYLIST_LOADED":
-                tracks = [models.Track.from_dict(track) for track in payload["tracks"]]
-                info = payload["playlistInfo"]
-                return models.YTPlaylist(
-                    name=info["name"],
-                    tracks=tracks,
-                    selected_track=info["selectedTrack"],
-                )
+        params = {"identifier": identifier}
 
-            elif payload["loadType"] == "LOAD_FAILED":
-                exception = payload["exception"]
-                raise errors.TrackLoadError(f'{exception["severity"]}: {exception["message"]}')
+        started = time.perf_counter()
+        try:
+            async with self._request("GET", "/loadtracks", params=params) as resp:
+                payload: typing.Dict[str, typing.Any] = self.codec.loads(await resp.read())
+        finally:
+            self.loadtracks_latency.observe(time.perf_counter() - started)
+
+        if payload.get("error", None):
+            raise errors.TrackLoadError(f"{payload['error']}: {payload['message']}")
 
-            raise ValueError(f"Recieved unknown response: {payload}")
+        if self.disk_cache is not None:
+            await self.disk_cache.put_result(identifier, payload)
+        return payload
 
     async def fetch_track(self, track_id: str) -> models.Track:
+        """Get the track for the given base64 track identifier.
 
-        if not self.session:
-            raise RuntimeError("Connect to the the node before send a request")
-        params = {"track": track_id}
-        async with self.session.get(
-            f"http://{self.host}:{self.port}/decodetrack",
-            headers=self.headers,
-            params=params,
+        The identifier is decoded locally, lavalink is only requested when the
+        track message version is not supported by `yougan.decoder`.
+
+        Parameters
+        ----------
+        track_id: builtins.str
+            The base64 track identifier given by lavalink.
+
+        Returns
+        -------
+        yougan.models.Track
+            The decoded track.
+        """
+        if tracing.observers:
+            with tracing.Span("yougan.fetch_track", node=self.name):
+                return await self._fetch_track(track_id)
+        return await self._fetch_track(track_id)
+
+    async def _fetch_track(self, track_id: str) -> models.Track:
+        try:
+            return decoder.decode_track(track_id)
+        except errors.TrackDecodeError as exc:
+            _LOGGER.debug("Falling back to Node::%s to decode track: %s", self.name, exc)
+
+        return await self._decode_track(track_id)
+
+    async def fetch_tracks(
+        self, track_ids: typing.Sequence[str], *, chunk_size: int = 100, concurrency: int = 8
+    ) -> typing.List[models.Track]:
+        """Get the tracks for the given base64 track identifiers.
+
+        Identifiers which cannot be decoded locally are sent to lavalink's
+        `/decodetracks` endpoint in chunks. If the node does not provide that
+        endpoint, they are requested one by one through `/decodetrack` instead.
+
+        Parameters
+        ----------
+        track_ids: typing.Sequence[builtins.str]
+            The base64 track identifiers given by lavalink.
+
+        Other Parameters
+        ----------------
+        chunk_size: builtins.int
+            The maximum amount of identifiers sent in a single request.
+        concurrency: builtins.int
+            The maximum amount of requests made to the node at once.
+
+        Returns
+        -------
+        typing.List[yougan.models.Track]
+            The decoded tracks, in the same order as the identifiers.
+        """
+        if chunk_size <= 0 or concurrency <= 0:
+            raise ValueError("chunk_size and concurrency must be greater than 0")
+
+        tracks: typing.List[typing.Optional[models.Track]] = [None] * len(track_ids)
+        pending: typing.List[int] = []
+        for index, track_id in enumerate(track_ids):
+            try:
+                tracks[index] = decoder.decode_track(track_id)
+            except errors.TrackDecodeError:
+                pending.append(index)
+
+        if pending and self.disk_cache is not None:
+            stored = await self.disk_cache.get_tracks([track_ids[index] for index in pending])
+            for index in pending:
+                if (info := stored.get(track_ids[index])) is not None:
+                    tracks[index] = models.Track.from_dict({"track": track_ids[index], "info": info})
+            pending = [index for index in pending if tracks[index] is None]
+
+        if pending:
+            _LOGGER.debug("Decoding %s tracks using Node::%s", len(pending), self.name)
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def decode_one(index: int) -> None:
+                async with semaphore:
+                    tracks[index] = await self._decode_track(track_ids[index])
+
+            async def decode_chunk(indexes: typing.List[int]) -> None:
+                async with semaphore:
+                    decoded = await self._decode_tracks([track_ids[index] for index in indexes])
+
+                if decoded is None:
+                    await asyncio.gather(*(decode_one(index) for index in indexes))
+                    return
+
+                for index, track in zip(indexes, decoded):
+                    tracks[index] = track
+
+            await asyncio.gather(
+                *(decode_chunk(pending[start : start + chunk_size]) for start in range(0, len(pending), chunk_size))
+            )
+
+        return typing.cast(typing.List[models.Track], tracks)
+
+    async def _decode_tracks(self, track_ids: typing.List[str]) -> typing.Optional[typing.List[models.Track]]:
+        if not self.supports_bulk_decode:
+            return None
+
+        async with self._request(
+            "POST",
+            "/decodetracks",
+            headers={**self.headers, "Content-Type": "application/json"},
+            data=self.codec.dumps(track_ids),
         ) as resp:
-            payload = await resp.json()
-            payload = {"track": track_id, "info": payload}
-            return models.Track.from_dict(payload)
+            if resp.status in (404, 405):
+                _LOGGER.info("Node::%s does not support /decodetracks, decoding tracks one by one", self.name)
+                self.supports_bulk_decode = False
+                return None
+
+            resp.raise_for_status()
+            payload: typing.List[typing.Dict[str, typing.Any]] = self.codec.loads(await resp.read())
 
-    async def start(self) -> None:
-        """Connects to the lavalink server using the given credentials."""
+        if self.disk_cache is not None:
+            await self.disk_cache.put_tracks({track["track"]: track["info"] for track in payload})
+        return [models.Track.from_dict(track) for track in payload]
+
+    async def _decode_track(self, track_id: str) -> models.Track:
+        if self.disk_cache is not None:
+            info = await self.disk_cache.get_track(track_id)
+            if info is not None:
+                return models.Track.from_dict({"track": track_id, "info": info})
+
+        params = {"track": track_id}
+        async with self._request("GET", "/decodetrack", params=params) as resp:
+            info = self.codec.loads(await resp.read())
+
+        if self.disk_cache is not None:
+            await self.disk_cache.put_track(track_id, info)
+        return models.Track.from_dict({"track": track_id, "info": info})
+
+    async def start(self, *, timeout: typing.Optional[float] = None) -> None:
+        """Connects to the lavalink server using the given credentials.
+
+        Parameters
+        ----------
+        timeout: typing.Optional[builtins.float]
+            Seconds to wait for the websocket to be established.
+
+        Raises
+        ------
+        yougan.errors.NodeAlreadyConnected
+            If the node is already connected.
+        asyncio.TimeoutError
+            If the node could not be reached in time.
+        """
         _LOGGER.info("Attempting to connect to Node::%s", self.name)
 
-        if not self.connection or not self.connection.is_connected:
+        if self.is_connected:
             raise errors.NodeAlreadyConnected(self.name)
 
-        self.connection = Connection(
-            host=self.host, port=self.port, password=self.password, node=self, session=self.session
+        if self.connection:
+            # A previous connection may still be trying to reconnect in the background.
+            await self.connection.close(timeout=0)
+
+        connection = self.connection = Connection(
+            host=self.host,
+            port=self.port,
+            password=self.password,
+            node=self,
+            session=self._http(),
+            send_options=self.send_options,
+            reconnect_options=self.reconnect_options,
+            max_pending_events=self.max_pending_events,
         )
-        await self.connection.connect_node()
+        try:
+            await asyncio.wait_for(connection.connect_node(), timeout)
+        except BaseException:
+            await connection.close(timeout=0)
+            if self.connection is connection:
+                self.connection = None
+                self.is_connected = False
+            raise
+
         self.is_connected = True
 
     async def connect_vc(
@@ -172,11 +441,158 @@ class Node:
 
         await self.connection.send(payload)
 
-    async def destroy(self) -> None:
-        """Closes the connection to the lavalink server."""
-        _LOGGER.info("Disconnecting from Node::%s", self.name)
+    def _select_players(
+        self, guild_ids: typing.Optional[typing.Iterable[snowflakes.SnowflakeishOr[guilds.Guild]]]
+    ) -> typing.Tuple[typing.List[Player], typing.Dict[int, Exception]]:
+        if guild_ids is None:
+            return list(self.players.values()), {}
+
+        players: typing.List[Player] = []
+        failures: typing.Dict[int, Exception] = {}
+        for guild in guild_ids:
+            if player := self.players.get(int(guild)):
+                players.append(player)
+            else:
+                failures[int(guild)] = LookupError(f"No player in guild {int(guild)} on Node::{self.name}")
+        return players, failures
+
+    async def _send_bulk(
+        self,
+        guild_ids: typing.Optional[typing.Iterable[snowflakes.SnowflakeishOr[guilds.Guild]]],
+        op: typing.Dict[str, typing.Any],
+    ) -> typing.Tuple[typing.List[Player], typing.Dict[int, Exception]]:
+        # Returns the players whose frame was queued, and why the others were not.
+        players, failures = self._select_players(guild_ids)
+        if not players:
+            return players, failures
+
         if not self.connection:
-            return
+            error = RuntimeError(f"Node::{self.name} is not connected yet")
+            failures.update((int(player.guild_id), error) for player in players)
+            return [], failures
+
+        results = await self.connection.send_many([{**op, "guildId": str(player.guild_id)} for player in players])
+        sent: typing.List[Player] = []
+        for player, result in zip(players, results):
+            if result is None:
+                sent.append(player)
+            else:
+                failures[int(player.guild_id)] = result
+        return sent, failures
+
+    async def pause_players(
+        self,
+        guild_ids: typing.Optional[typing.Iterable[snowflakes.SnowflakeishOr[guilds.Guild]]] = None,
+        *,
+        pause: bool = True,
+    ) -> typing.Dict[int, Exception]:
+        """Pause or resume several players of this node at once.
+
+        The frames of every player are queued as a single batch instead of
+        waiting on each other.
+
+        Parameters
+        ----------
+        guild_ids: typing.Optional[typing.Iterable[hikari.snowflakes.SnowflakeishOr[hikari.guilds.Guild]]]
+            The guilds whose player is paused. Every player of the node if `None`.
+        pause: builtins.bool
+            Resume the players instead if false.
+
+        Returns
+        -------
+        typing.Dict[builtins.int, builtins.Exception]
+            The players which could not be paused, by guild id.
+        """
+        players, failures = await self._send_bulk(guild_ids, {"op": "pause", "pause": pause})
+        for player in players:
+            if pause != player.is_paused:
+                player._set_position(player.position)
+            player.is_paused = pause
+        return failures
+
+    async def set_players_volume(
+        self, volume: int, guild_ids: typing.Optional[typing.Iterable[snowflakes.SnowflakeishOr[guilds.Guild]]] = None
+    ) -> typing.Dict[int, Exception]:
+        """Set the volume of several players of this node at once.
+
+        Parameters
+        ----------
+        volume: builtins.int
+            The volume to set.
+        guild_ids: typing.Optional[typing.Iterable[hikari.snowflakes.SnowflakeishOr[hikari.guilds.Guild]]]
+            The guilds whose player is changed. Every player of the node if `None`.
+
+        Returns
+        -------
+        typing.Dict[builtins.int, builtins.Exception]
+            The players whose volume could not be set, by guild id.
+        """
+        players, failures = await self._send_bulk(guild_ids, {"op": "volume", "volume": volume})
+        for player in players:
+            player.volume = volume
+        return failures
+
+    async def stop_players(
+        self, guild_ids: typing.Optional[typing.Iterable[snowflakes.SnowflakeishOr[guilds.Guild]]] = None
+    ) -> typing.Dict[int, Exception]:
+        """Stop the current track of several players of this node at once.
+
+        Parameters
+        ----------
+        guild_ids: typing.Optional[typing.Iterable[hikari.snowflakes.SnowflakeishOr[hikari.guilds.Guild]]]
+            The guilds whose player is stopped. Every player of the node if `None`.
+
+        Returns
+        -------
+        typing.Dict[builtins.int, builtins.Exception]
+            The players which could not be stopped, by guild id.
+        """
+        players, failures = await self._send_bulk(guild_ids, {"op": "stop"})
+        for player in players:
+            player._set_position(player.position)
+            player.is_stopped = True
+        return failures
+
+    async def destroy_players(
+        self, guild_ids: typing.Optional[typing.Iterable[snowflakes.SnowflakeishOr[guilds.Guild]]] = None
+    ) -> typing.Dict[int, Exception]:
+        """Destroy several players of this node at once and leave their voice channel.
+
+        Parameters
+        ----------
+        guild_ids: typing.Optional[typing.Iterable[hikari.snowflakes.SnowflakeishOr[hikari.guilds.Guild]]]
+            The guilds whose player is destroyed. Every player of the node if `None`.
+
+        Returns
+        -------
+        typing.Dict[builtins.int, builtins.Exception]
+            The players which could not be destroyed, by guild id.
+        """
+        players, failures = await self._send_bulk(guild_ids, {"op": "destroy"})
+        for player in players:
+            self.players.pop(int(player.guild_id), None)
+        self.refresh_rank()
+
+        results = await asyncio.gather(*(player._on_close(player) for player in players), return_exceptions=True)
+        for player, result in zip(players, results):
+            if isinstance(result, Exception):
+                failures[int(player.guild_id)] = result
+            elif isinstance(result, BaseException):
+                raise result
+        return failures
+
+    async def destroy(self, *, timeout: typing.Optional[float] = 5.0) -> None:
+        """Closes the connection to the lavalink server, and the connection pool of the node if it created it.
+
+        Parameters
+        ----------
+        timeout: typing.Optional[builtins.float]
+            Seconds to wait for the queued frames to be sent before closing anyway.
+        """
+        _LOGGER.info("Disconnecting from Node::%s", self.name)
+        if self.connection:
+            await self.connection.close(timeout=timeout)
+            self.is_connected = False
 
-        await self.connection.close()
-        self.is_connected = False
+        if self._owns_session and self.session:
+            await self.session.close()
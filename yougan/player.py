@@ -1,15 +1,23 @@
 from __future__ import annotations
-from email.policy import default
+import asyncio
+import base64
+import binascii
 import logging
+import time
 
 import typing
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from hikari import events
 from hikari.api import VoiceConnection, VoiceComponent
 
+from yougan import errors
+from yougan import events as yougan_events
+from yougan import models
 from yougan.models import Track
+from yougan.queue import Queue, QueueItem
+from yougan.regions import RegionResolver
 
 if typing.TYPE_CHECKING:
     from hikari import snowflakes
@@ -19,6 +27,10 @@ if typing.TYPE_CHECKING:
     _T = typing.TypeVar("_T")
 
 __all__: typing.Tuple[str, ...] = ("Player",)
+_LOGGER = logging.getLogger("yougan")
+
+_ADVANCE_REASONS = frozenset(("FINISHED", "LOAD_FAILED"))
+"""Track end reasons after which the next queued track is played."""
 
 
 @dataclass
@@ -40,6 +52,16 @@ class Player(VoiceConnection):
     is_stopped: bool = True
     is_paused: bool = False
     volume: int = 100
+    _position: int = 0
+    _position_at: float = 0.0
+    _position_interval: typing.Optional[float] = None
+    _position_synced_at: float = float("-inf")
+
+    queue: Queue = field(default_factory=Queue)
+    auto_advance: bool = True
+    """Play the next queued track when the current one finishes."""
+    _prefetch: typing.Optional[asyncio.Task[None]] = None
+    _select_node: typing.Optional[typing.Callable[[str, typing.Optional[Node]], Node]] = None
 
     @property
     def channel_id(self) -> snowflakes.Snowflake:
@@ -95,6 +117,53 @@ class Player(VoiceConnection):
         """Return the current playing track."""
         return self._current_track
 
+    @property
+    def position(self) -> int:
+        """Return the position of the player on the current track in milliseconds.
+
+        The position last reported by lavalink is moved forward by the time
+        elapsed since, unless the player is paused or stopped, so it stays
+        accurate between two `playerUpdate` ops.
+        """
+        if self.is_paused or self.is_stopped or not self._current_track:
+            return self._position
+
+        position = self._position + int((time.monotonic() - self._position_at) * 1000)
+        if self._current_track.is_stream:
+            return position
+        return min(position, self._current_track.length)
+
+    def _set_position(self, position: int) -> None:
+        self._position = position
+        self._position_at = time.monotonic()
+
+    @property
+    def is_subscribed(self) -> bool:
+        """Return `builtins.True` if the position updates of this player are dispatched."""
+        return self._position_interval is not None
+
+    def subscribe(self, interval: float = 1.0) -> None:
+        """Dispatch a `yougan.events.PlayerUpdateEvent` for the position updates of this player.
+
+        Updates coming from lavalink more often than the interval are
+        dropped before being parsed, the others also correct `Player.position`.
+
+        Parameters
+        ----------
+        interval: builtins.float
+            Minimum seconds between two dispatched updates, 0 to get every one of them.
+        """
+        if interval < 0:
+            raise ValueError("interval must not be negative")
+        self._position_interval = interval
+
+    def unsubscribe(self) -> None:
+        """Stop dispatching the position updates of this player.
+
+        They are then only applied following `Node.player_update_interval`.
+        """
+        self._position_interval = None
+
     @property
     def is_playing(self) -> bool:
         """Return `builtins.True` if the player is currently playing a track
@@ -113,7 +182,14 @@ class Player(VoiceConnection):
         await self.node.connect_vc(self.guild_id, self._session_id, self._token, self._endpoint)
         self.is_connected = True
 
-    async def play(self, track: Track, replace: bool = False) -> None:
+    async def play(
+        self,
+        track: Track,
+        replace: bool = False,
+        *,
+        start_time: typing.Optional[int] = None,
+        end_time: typing.Optional[int] = None,
+    ) -> None:
         """Plays the given track in the voice channel.
 
         Parameters
@@ -122,42 +198,150 @@ class Player(VoiceConnection):
             The track to play
         replace: builtins.bool
             If true, the requested track will replace the current playing track.
+
+        Other Parameters
+        ----------------
+        start_time: typing.Optional[builtins.int]
+            Position in milliseconds to start the track at.
+        end_time: typing.Optional[builtins.int]
+            Position in milliseconds to stop the track at.
         """
         if not isinstance(track, Track):
             raise TypeError(f"Expected arg track to be a subclass of 'Track' but recieved '{type(track)}'")
 
-        await self.node._send(
-            {
-                "op": "play",
-                "guildId": str(self.guild_id),
-                "track": track.id,
-                "noReplace": not replace,
-            }
+        payload: typing.Dict[str, typing.Any] = {
+            "op": "play",
+            "guildId": str(self.guild_id),
+            "track": track.id,
+            "noReplace": not replace,
+        }
+        if start_time is not None:
+            payload["startTime"] = start_time
+        if end_time is not None:
+            payload["endTime"] = end_time
+        await self.node._send(payload)
+
+        if replace or self.is_stopped or not self._current_track:
+            self._current_track = track
+            self._set_position(start_time or 0)
+            self.is_stopped = False
+
+    async def play_next(self, *, skip: bool = False) -> typing.Optional[Track]:
+        """Play the next track of the queue, replacing the current one.
+
+        Parameters
+        ----------
+        skip: builtins.bool
+            Move on even if the current track is set to repeat.
+
+        Returns
+        -------
+        typing.Optional[yougan.models.Track]
+            The track now playing, or `None` if the queue is empty.
+        """
+        item = self.queue.next(skip=skip)
+        if item is None:
+            if skip:
+                await self.stop()
+            return None
+
+        track = await self._resolve(item)
+        self.queue.resolved(item, track)
+        await self.play(track, replace=True)
+        return track
+
+    async def skip(self) -> typing.Optional[Track]:
+        """Skip the current track and play the next queued one."""
+        return await self.play_next(skip=True)
+
+    async def _resolve(self, item: QueueItem) -> Track:
+        if isinstance(item, Track):
+            return item
+
+        # Queued track identifiers are fetched from the node, anything else is searched for.
+        try:
+            return await self.node.fetch_track(item) if _is_track_id(item) else await self._search(item)
+        except errors.YouganError:
+            raise
+        except Exception as exc:
+            raise errors.TrackLoadError(str(exc)) from exc
+
+    async def _search(self, query: str) -> Track:
+        result = await self.node.search_tracks(query)
+        if isinstance(result, Track):
+            return result
+        if isinstance(result, models.YTPlaylist) and 0 <= result.selected_track < len(result.tracks):
+            return result.tracks[result.selected_track]
+        if result.tracks:
+            return result.tracks[0]
+        raise errors.TrackLoadError(f"No tracks found for {query}")
+
+    def _schedule_prefetch(self) -> None:
+        upcoming = self.queue.peek()
+        if upcoming is None or isinstance(upcoming, Track):
+            return
+        if self._prefetch and not self._prefetch.done():
+            return
+        self._prefetch = asyncio.get_running_loop().create_task(
+            self._prefetch_item(upcoming), name=f"Prefetch for guild {self.guild_id}"
         )
 
-        self._current_track = track
+    async def _prefetch_item(self, item: str) -> None:
+        try:
+            track = await self._resolve(item)
+        except errors.YouganError as exc:
+            _LOGGER.warning("Failed to prefetch %s in guild %s: %s", item, self.guild_id, exc)
+            return
+        self.queue.resolved(item, track)
+
+    async def _handle_track_event(self, event: yougan_events.TrackEvent) -> None:
+        if isinstance(event, yougan_events.TrackStartEvent):
+            self._schedule_prefetch()
+        elif isinstance(event, yougan_events.TrackEndEvent):
+            if event.reason not in _ADVANCE_REASONS:
+                return
+            self._set_position(self.position)
+            self.is_stopped = True
+            if self.auto_advance:
+                await self.play_next()
 
     async def stop(self) -> None:
         """Stop the current playing track."""
         await self.node._send({"op": "stop", "guildId": str(self.guild_id)})
+        self._set_position(self.position)
         self.is_stopped = True
 
     async def pause(self) -> None:
         """Pause the current playing track."""
         await self.node._send({"op": "pause", "guildId": str(self.guild_id), "pause": True})
+        self._set_position(self.position)
         self.is_paused = True
 
     async def disconnect(self) -> None:
         """Destroy and disconnect the player from the voice channel."""
         await self.node._send({"op": "destroy", "guildId": str(self.guild_id)})
         del self.node.players[self.guild_id]
+        self.node.refresh_rank()
         await self._on_close(self)
 
     async def resume(self) -> None:
         """Resume the current playing track if it was paused."""
         await self.node._send({"op": "pause", "guildId": str(self.guild_id), "pause": False})
+        if self.is_paused:
+            self._set_position(self._position)
         self.is_paused = False
 
+    async def seek(self, position: int) -> None:
+        """Seek to a position in the current playing track.
+
+        Parameters
+        ----------
+        position: int
+            The position to seek to, in milliseconds.
+        """
+        await self.node._send({"op": "seek", "guildId": str(self.guild_id), "position": position})
+        self._set_position(position)
+
     async def set_volume(self, volume: int) -> None:
         """Set the volume of the current player.
         Parameters
@@ -168,15 +352,86 @@ class Player(VoiceConnection):
         await self.node._send({"op": "volume", "guildId": str(self.guild_id), "volume": volume})
         self.volume = volume
 
+    async def move_to(self, node: Node) -> None:
+        """Move the player to another node, keeping the current track, position, volume and pause state.
+
+        Parameters
+        ----------
+        node: yougan.node.Node
+            The node to move the player to.
+        """
+        old_node = self.node
+        if node is old_node:
+            return
+
+        _LOGGER.debug("Moving player in guild %s from Node::%s to Node::%s", self.guild_id, old_node.name, node.name)
+        if old_node.is_connected:
+            try:
+                await old_node._send({"op": "destroy", "guildId": str(self.guild_id)})
+            except Exception:
+                _LOGGER.warning("Failed to destroy player in guild %s on Node::%s", self.guild_id, old_node.name)
+
+        old_node.players.pop(self.guild_id, None)
+        old_node.refresh_rank()
+        self.node = node
+        node.players[self.guild_id] = self
+        node.refresh_rank()
+
+        await self._replay()
+
+    async def _replay(self) -> None:
+        """Recreate the player on its node from the locally known state."""
+        await self._connect()
+        await self._send_state()
+
+    async def _send_state(self) -> None:
+        if self._current_track and not self.is_stopped:
+            await self.node._send(
+                {
+                    "op": "play",
+                    "guildId": str(self.guild_id),
+                    "track": self._current_track.id,
+                    "startTime": self.position,
+                    "volume": self.volume,
+                    "pause": self.is_paused,
+                }
+            )
+        elif self.volume != 100:
+            await self.node._send({"op": "volume", "guildId": str(self.guild_id), "volume": self.volume})
+
     async def notify(self, event: events.VoiceEvent) -> None:
         """Called when a voice update happens in the connected channel"""
-        logging.debug("Ignoring voice event %s", event)
+        if isinstance(event, events.VoiceStateUpdateEvent):
+            if event.state.user_id == self._user_id:
+                self._session_id = event.state.session_id
+            return
+
+        if not isinstance(event, events.VoiceServerUpdateEvent) or event.endpoint is None:
+            _LOGGER.debug("Ignoring voice event %s", event)
+            return
+
+        endpoint, self._endpoint = self._endpoint, event.endpoint
+        self._token = event.token
 
-    def _update_state(self, *, position: int = 0, length: int) -> None:
+        node = self.node
+        if self._select_node and RegionResolver.location(endpoint) != RegionResolver.location(self._endpoint):
+            node = self._select_node(self._endpoint, self.node)
+
+        if node is not self.node:
+            _LOGGER.info(
+                "Voice server of guild %s moved to %s, re-routing to Node::%s", self.guild_id, self._endpoint, node.name
+            )
+            await self.move_to(node)
+        else:
+            await self._connect()
+
+    def _update_state(self, *, position: int = 0) -> None:
+        # Tracks are shared between players, so the position is kept on the player. The local clock is used
+        # to move it forward as the one of lavalink may be skewed.
         if not self._current_track:
             return
-        self._current_track.position = position
-        self._current_track.length = length
+        self._set_position(position)
+        self._position_synced_at = self._position_at
 
     @classmethod
     async def initialize(
@@ -221,16 +476,23 @@ class Player(VoiceConnection):
             The user ID of the account that just joined the voice channel.
         **kwargs : typing.Any
             Any implementation-specific arguments to provide to the
-            voice connection that is being initialized.
+            voice connection that is being initialized. Either `node`, the
+            node to play from, or `select_node`, a callable picking a node
+            from the voice endpoint, is required.
 
         Returns
         -------
         yougan.player.Player
             The type of this connection object.
         """
+        from yougan.node import Node
+
+        select_node = kwargs.get("select_node")
         if node := kwargs.get("node"):
             if not isinstance(node, Node):
                 raise TypeError(f"Expected 'node' to be of type 'Node' but got type '{type(node)}'")
+        elif select_node:
+            node = select_node(endpoint, None)
         else:
             raise KeyError("Missing node parameter")
 
@@ -245,6 +507,19 @@ class Player(VoiceConnection):
             _token=token,
             _user_id=user_id,
             node=node,
+            _select_node=select_node,
         )
         await cls._connect()
         return cls
+
+
+def _is_track_id(item: str) -> bool:
+    # Only the shape is checked here, `Node.fetch_track` decodes the track or falls back to lavalink.
+    try:
+        buffer = base64.b64decode(item, validate=True)
+    except (binascii.Error, ValueError):
+        return False
+    if len(buffer) < 4:
+        return False
+    size = int.from_bytes(buffer[:4], "big") & 0x3FFFFFFF
+    return 0 < size <= len(buffer) - 4
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import collections
+import enum
+import random
+import typing
+
+from yougan.models import Track
+
+__all__: typing.Tuple[str, ...] = ("Queue", "RepeatMode", "QueueItem")
+
+QueueItem = typing.Union[Track, str]
+"""A track, or a query resolved when it gets close to playing."""
+
+
+class RepeatMode(enum.Enum):
+    NONE = "none"
+    """Play every track once."""
+
+    TRACK = "track"
+    """Keep playing the current track."""
+
+    QUEUE = "queue"
+    """Put every finished track back at the end of the queue."""
+
+
+class Queue:
+    """Tracks waiting to be played by a player.
+
+    Pushing and popping from either end is O(1).
+
+    Parameters
+    ----------
+    history_size: builtins.int
+        The amount of played tracks remembered.
+    """
+
+    def __init__(self, *, history_size: int = 50) -> None:
+        self._items: typing.Deque[QueueItem] = collections.deque()
+
+        self.history: typing.Deque[QueueItem] = collections.deque(maxlen=history_size)
+        """Previously played tracks, most recent last."""
+
+        self.current: typing.Optional[QueueItem] = None
+        """The track taken from the queue last."""
+
+        self.repeat = RepeatMode.NONE
+        """How tracks are repeated."""
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> typing.Iterator[QueueItem]:
+        return iter(self._items)
+
+    def __getitem__(self, index: int) -> QueueItem:
+        return self._items[index]
+
+    def push(self, *items: QueueItem) -> None:
+        """Add tracks to the end of the queue."""
+        self._items.extend(items)
+
+    def push_next(self, item: QueueItem) -> None:
+        """Add a track to the front of the queue, so it plays next."""
+        self._items.appendleft(item)
+
+    def remove(self, index: int) -> QueueItem:
+        """Remove and return the track at the given index."""
+        item = self._items[index]
+        del self._items[index]
+        return item
+
+    def clear(self) -> None:
+        """Remove every queued track."""
+        self._items.clear()
+
+    def shuffle(self) -> None:
+        """Shuffle the queued tracks."""
+        items = list(self._items)
+        random.shuffle(items)
+        self._items = collections.deque(items)
+
+    def peek(self) -> typing.Optional[QueueItem]:
+        """Return the track that `Queue.next` would return, without taking it."""
+        if self.repeat is RepeatMode.TRACK and self.current is not None:
+            return self.current
+        if self._items:
+            return self._items[0]
+        if self.repeat is RepeatMode.QUEUE:
+            return self.current
+        return None
+
+    def next(self, *, skip: bool = False) -> typing.Optional[QueueItem]:
+        """Take the track to play next, following the repeat mode.
+
+        Parameters
+        ----------
+        skip: builtins.bool
+            Move on from the current track even if it is repeated.
+
+        Returns
+        -------
+        typing.Optional[typing.Union[yougan.models.Track, builtins.str]]
+            The track to play, or `None` if there is nothing left to play.
+        """
+        if self.repeat is RepeatMode.TRACK and self.current is not None and not skip:
+            return self.current
+
+        if self.current is not None:
+            self.history.append(self.current)
+            if self.repeat is RepeatMode.QUEUE:
+                self._items.append(self.current)
+
+        self.current = self._items.popleft() if self._items else None
+        return self.current
+
+    def resolved(self, item: QueueItem, track: Track) -> None:
+        """Replace an upcoming query by the track it resolved to."""
+        if self._items and self._items[0] is item:
+            self._items[0] = track
+        elif self.current is item:
+            self.current = track
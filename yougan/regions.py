@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import re
+import typing
+
+__all__: typing.Tuple[str, ...] = ("RegionResolver", "DEFAULT_REGIONS")
+
+DEFAULT_REGIONS: typing.Dict[str, str] = {
+    # North America
+    "us-east": "us",
+    "us-west": "us",
+    "us-central": "us",
+    "us-south": "us",
+    "atlanta": "us",
+    "newark": "us",
+    "seattle": "us",
+    "santa-clara": "us",
+    "iad": "us",
+    "ewr": "us",
+    "atl": "us",
+    "ord": "us",
+    "dfw": "us",
+    "lax": "us",
+    "sea": "us",
+    "sjc": "us",
+    "montreal": "us",
+    "yul": "us",
+    # Europe
+    "rotterdam": "eu",
+    "amsterdam": "eu",
+    "europe": "eu",
+    "eu-central": "eu",
+    "eu-west": "eu",
+    "frankfurt": "eu",
+    "london": "eu",
+    "madrid": "eu",
+    "milan": "eu",
+    "stockholm": "eu",
+    "finland": "eu",
+    "bucharest": "eu",
+    "russia": "eu",
+    "ams": "eu",
+    "fra": "eu",
+    "lhr": "eu",
+    "mad": "eu",
+    "mxp": "eu",
+    "arn": "eu",
+    "hel": "eu",
+    "otp": "eu",
+    "waw": "eu",
+    # Asia
+    "singapore": "asia",
+    "hongkong": "asia",
+    "japan": "asia",
+    "tokyo": "asia",
+    "india": "asia",
+    "mumbai": "asia",
+    "south-korea": "asia",
+    "southkorea": "asia",
+    "dubai": "asia",
+    "israel": "asia",
+    "sin": "asia",
+    "hkg": "asia",
+    "nrt": "asia",
+    "hnd": "asia",
+    "bom": "asia",
+    "icn": "asia",
+    "dxb": "asia",
+    "tlv": "asia",
+    # South America
+    "brazil": "sa",
+    "santiago": "sa",
+    "buenos-aires": "sa",
+    "gru": "sa",
+    "scl": "sa",
+    "eze": "sa",
+    # Oceania
+    "sydney": "oceania",
+    "syd": "oceania",
+    # Africa
+    "southafrica": "africa",
+    "south-africa": "africa",
+    "jnb": "africa",
+}
+"""Discord voice server locations, as found in the voice endpoints, by the region they belong to."""
+
+_ENDPOINT = re.compile(r"^(?:[a-z]+://)?(?:c-)?([a-z]+(?:-[a-z]+)*?)(?:-?\d+)")
+
+
+class RegionResolver:
+    """Finds the region of a Discord voice server from its endpoint.
+
+    `rotterdam1234.discord.media:443` is located in `rotterdam`, which belongs
+    to the `eu` region. Nodes can be tagged with either.
+
+    Parameters
+    ----------
+    regions: typing.Optional[typing.Mapping[builtins.str, builtins.str]]
+        Regions by voice server location. Extends `DEFAULT_REGIONS`.
+    """
+
+    def __init__(self, regions: typing.Optional[typing.Mapping[str, str]] = None) -> None:
+        self.regions = {**DEFAULT_REGIONS, **(regions or {})}
+
+    @staticmethod
+    def location(endpoint: typing.Optional[str]) -> typing.Optional[str]:
+        """Return the location of the voice server, such as `rotterdam`, or `None` if it cannot be parsed."""
+        if not endpoint:
+            return None
+        match = _ENDPOINT.match(endpoint.lower())
+        return match.group(1) if match else None
+
+    def resolve(self, endpoint: typing.Optional[str]) -> typing.FrozenSet[str]:
+        """Return the tags of the nodes close to this voice server.
+
+        Returns
+        -------
+        typing.FrozenSet[builtins.str]
+            The location and its region, if known. Empty if the endpoint cannot be parsed.
+        """
+        location = self.location(endpoint)
+        if location is None:
+            return frozenset()
+        region = self.regions.get(location)
+        return frozenset((location, region)) if region else frozenset((location,))
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import gzip
+import os
+import time
+import typing
+
+from yougan import codec as codec_
+from yougan.models import Track
+from yougan.queue import RepeatMode
+
+if typing.TYPE_CHECKING:
+    from yougan.player import Player
+
+__all__: typing.Tuple[str, ...] = ("PlayerState", "dump_states", "load_states")
+
+VERSION = 1
+"""Version of the snapshot format, bumped whenever the fields change."""
+
+
+class PlayerState:
+    """The state of a player needed to recreate it after a restart."""
+
+    __slots__ = ("guild_id", "channel_id", "node", "track", "position", "volume", "paused", "queue", "repeat")
+
+    FIELDS: typing.Tuple[str, ...] = __slots__
+
+    def __init__(
+        self,
+        *,
+        guild_id: int,
+        channel_id: int,
+        node: str,
+        track: typing.Optional[str] = None,
+        position: int = 0,
+        volume: int = 100,
+        paused: bool = False,
+        queue: typing.Sequence[str] = (),
+        repeat: str = RepeatMode.NONE.value,
+    ) -> None:
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.node = node
+        """Name of the node the player was on."""
+        self.track = track
+        """Identifier of the track being played, `None` if the player was stopped."""
+        self.position = position
+        self.volume = volume
+        self.paused = paused
+        self.queue = list(queue)
+        """Track identifiers and queries waiting in the queue."""
+        self.repeat = repeat
+
+    @classmethod
+    def from_player(cls, player: Player) -> PlayerState:
+        """Capture the current state of a player."""
+        track = player.current_track if not player.is_stopped else None
+        return cls(
+            guild_id=int(player.guild_id),
+            channel_id=int(player.channel_id),
+            node=player.node.name,
+            track=track.id if track else None,
+            position=player.position,
+            volume=player.volume,
+            paused=player.is_paused,
+            queue=[item.id if isinstance(item, Track) else item for item in player.queue],
+            repeat=player.queue.repeat.value,
+        )
+
+    def to_row(self) -> typing.List[typing.Any]:
+        return [getattr(self, field) for field in self.FIELDS]
+
+    @classmethod
+    def from_row(cls, fields: typing.Sequence[str], row: typing.Sequence[typing.Any]) -> PlayerState:
+        # Unknown fields are ignored, so snapshots written by newer versions can still be read.
+        return cls(**{field: value for field, value in zip(fields, row) if field in cls.FIELDS})
+
+    def __repr__(self) -> str:
+        return f"PlayerState(guild_id={self.guild_id}, node={self.node!r}, track={self.track is not None})"
+
+
+def dump_states(
+    path: typing.Union[str, os.PathLike[str]],
+    states: typing.Iterable[PlayerState],
+    *,
+    codec: typing.Optional[codec_.JSONCodec] = None,
+) -> int:
+    """Write the states to a gzipped JSON file, replacing it atomically.
+
+    Each state is stored as a row of values under a single list of field
+    names, which keeps the file small for many players.
+
+    Returns
+    -------
+    builtins.int
+        The amount of states written.
+    """
+    codec = codec or codec_.default_codec()
+    rows = [state.to_row() for state in states]
+    document = {"version": VERSION, "saved_at": time.time(), "fields": PlayerState.FIELDS, "players": rows}
+
+    path = os.fspath(path)
+    temporary = f"{path}.tmp"
+    with gzip.open(temporary, "wb", compresslevel=6) as file:
+        file.write(codec.dumps(document).encode())
+    os.replace(temporary, path)
+    return len(rows)
+
+
+def load_states(
+    path: typing.Union[str, os.PathLike[str]], *, codec: typing.Optional[codec_.JSONCodec] = None
+) -> typing.List[PlayerState]:
+    """Read the states written by `dump_states`.
+
+    Raises
+    ------
+    ValueError
+        If the file was written with an unsupported format version.
+    """
+    codec = codec or codec_.default_codec()
+    with gzip.open(os.fspath(path), "rb") as file:
+        document = codec.loads(file.read())
+
+    if document.get("version") != VERSION:
+        raise ValueError(f"Unsupported snapshot version {document.get('version')}")
+
+    fields = document["fields"]
+    return [PlayerState.from_row(fields, row) for row in document["players"]]
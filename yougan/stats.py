@@ -1,8 +1,229 @@
+import array
+import math
+import time
 import typing
 
+__all__: typing.Tuple[str, ...] = ("Stats", "StatsHistory", "LatencyTracker")
+
+
+class StatsHistory:
+    """Fixed size ring buffer of the `stats` ops received from a node.
+
+    Every field is stored in its own preallocated `array.array`, so the memory
+    used does not grow with the amount of samples received.
+
+    Lavalink reports the frame stats as averages per minute, so
+    `mean("frames_nulled", 600)` is the amount of frames nulled per minute over
+    the last 10 minutes.
+
+    Parameters
+    ----------
+    capacity: builtins.int
+        The amount of samples kept. Lavalink sends stats every minute, so the
+        default keeps a day of history.
+    """
+
+    FIELDS: typing.Tuple[str, ...] = (
+        "players",
+        "active_players",
+        "used_memory",
+        "free_memory",
+        "allocated_memory",
+        "system_load",
+        "lavalink_load",
+        "frames_sent",
+        "frames_nulled",
+        "frames_deficit",
+    )
+
+    def __init__(self, capacity: int = 1440) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+
+        self.capacity = capacity
+        self._times = array.array("d", bytes(8 * capacity))
+        self._columns = {name: array.array("d", bytes(8 * capacity)) for name in self.FIELDS}
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, stats: "Stats", timestamp: typing.Optional[float] = None) -> None:
+        """Record the current values of the stats."""
+        index = self._next
+        self._times[index] = time.monotonic() if timestamp is None else timestamp
+        for name, column in self._columns.items():
+            column[index] = getattr(stats, name)
+
+        self._next = (index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _indexes(self, window: typing.Optional[float]) -> typing.List[int]:
+        # Oldest to newest indexes of the samples inside the window.
+        oldest = (self._next - self._size) % self.capacity
+        indexes = [(oldest + offset) % self.capacity for offset in range(self._size)]
+        if window is None:
+            return indexes
+
+        since = time.monotonic() - window
+        for position, index in enumerate(indexes):
+            if self._times[index] >= since:
+                return indexes[position:]
+        return []
+
+    def values(self, field: str, window: typing.Optional[float] = None) -> typing.List[float]:
+        """Return the samples of a field, oldest first.
+
+        Parameters
+        ----------
+        field: builtins.str
+            One of `StatsHistory.FIELDS`.
+        window: typing.Optional[builtins.float]
+            Only return the samples of the last `window` seconds. All samples are returned if `None`.
+        """
+        column = self._columns[field]
+        return [column[index] for index in self._indexes(window)]
+
+    def mean(self, field: str, window: typing.Optional[float] = None) -> typing.Optional[float]:
+        """Return the mean of a field over the window, or `None` if there are no samples."""
+        values = self.values(field, window)
+        if not values:
+            return None
+        return math.fsum(values) / len(values)
+
+    def maximum(self, field: str, window: typing.Optional[float] = None) -> typing.Optional[float]:
+        """Return the highest value of a field over the window, or `None` if there are no samples."""
+        values = self.values(field, window)
+        return max(values) if values else None
+
+    def percentile(self, field: str, percent: float, window: typing.Optional[float] = None) -> typing.Optional[float]:
+        """Return the percentile of a field over the window, or `None` if there are no samples.
+
+        Parameters
+        ----------
+        field: builtins.str
+            One of `StatsHistory.FIELDS`.
+        percent: builtins.float
+            The percentile to compute, between 0 and 100.
+        window: typing.Optional[builtins.float]
+            Seconds of history to use. All samples are used if `None`.
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError("percent must be between 0 and 100")
+
+        return _percentile(sorted(self.values(field, window)), percent)
+
+    def rate(self, field: str, window: typing.Optional[float] = None, *, per: float = 60.0) -> typing.Optional[float]:
+        """Return how much a field changed per `per` seconds over the window.
+
+        Returns `None` if there are less than two samples in the window.
+        """
+        indexes = self._indexes(window)
+        if len(indexes) < 2:
+            return None
+
+        first, last = indexes[0], indexes[-1]
+        elapsed = self._times[last] - self._times[first]
+        if elapsed <= 0:
+            return None
+
+        column = self._columns[field]
+        return (column[last] - column[first]) / elapsed * per
+
+    def frame_loss(self, window: typing.Optional[float] = None) -> typing.Optional[float]:
+        """Return the percentage of expected frames that were nulled or not sent over the window."""
+        sent = self.mean("frames_sent", window)
+        nulled = self.mean("frames_nulled", window)
+        deficit = self.mean("frames_deficit", window)
+        if sent is None or nulled is None or deficit is None or sent < 0:
+            return None
+        return _frame_loss(sent, nulled, deficit)
+
+
+def _percentile(values: typing.Sequence[float], percent: float) -> typing.Optional[float]:
+    # Linear interpolation between the closest ranks of sorted values.
+    if not values:
+        return None
+
+    rank = (len(values) - 1) * percent / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+class LatencyTracker:
+    """Latency samples of a node, in seconds.
+
+    Keeps an exponentially weighted moving average, which reacts to changes
+    without jumping on a single slow sample, and the last samples in a ring
+    buffer for percentiles.
+
+    Parameters
+    ----------
+    capacity: builtins.int
+        The amount of samples kept for percentiles.
+    alpha: builtins.float
+        Weight of a new sample in the moving average, between 0 and 1.
+    """
+
+    __slots__ = ("capacity", "alpha", "smoothed", "last", "count", "_samples", "_next")
+
+    def __init__(self, capacity: int = 256, *, alpha: float = 0.2) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be between 0 and 1")
+
+        self.capacity = capacity
+        self.alpha = alpha
+
+        self.smoothed: typing.Optional[float] = None
+        """Moving average of the samples, `None` until the first one."""
+
+        self.last: typing.Optional[float] = None
+        """The latest sample."""
+
+        self.count = 0
+        """Samples observed since the tracker was created."""
+
+        self._samples = array.array("d", bytes(8 * capacity))
+        self._next = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def observe(self, seconds: float) -> None:
+        """Record a sample."""
+        self.smoothed = seconds if self.smoothed is None else self.smoothed + self.alpha * (seconds - self.smoothed)
+        self.last = seconds
+        self.count += 1
+        self._samples[self._next] = seconds
+        self._next = (self._next + 1) % self.capacity
+
+    def percentile(self, percent: float) -> typing.Optional[float]:
+        """Return the percentile of the kept samples, or `None` if there are none.
+
+        Parameters
+        ----------
+        percent: builtins.float
+            The percentile to compute, between 0 and 100.
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError("percent must be between 0 and 100")
+        return _percentile(sorted(self._samples[: len(self)]), percent)
+
+
+def _frame_loss(sent: float, nulled: float, deficit: float) -> float:
+    # Lavalink computes the deficit as the expected frames minus the sent and nulled ones.
+    expected = sent + nulled + deficit
+    if expected <= 0:
+        return 0.0
+    return max(nulled + deficit, 0) / expected * 100
+
 
 class Stats:
-    def __init__(self) -> None:
+    def __init__(self, *, history_size: int = 1440) -> None:
         self.active_players = 0
         self.players = 0
 
@@ -21,6 +242,27 @@ class Stats:
         self.frames_nulled = -1
         self.frames_deficit = -1
 
+        self.history = StatsHistory(history_size)
+        """Past values of these stats."""
+
+    @property
+    def frame_loss(self) -> typing.Optional[float]:
+        """Percentage of the expected frames that were nulled or not sent in the last minute.
+
+        Returns `None` if lavalink did not report frame stats.
+        """
+        if self.frames_sent < 0:
+            return None
+        return _frame_loss(self.frames_sent, self.frames_nulled, self.frames_deficit)
+
+    @property
+    def nulled_percentage(self) -> typing.Optional[float]:
+        """Percentage of the expected frames that were nulled in the last minute."""
+        if self.frames_sent < 0:
+            return None
+        expected = self.frames_sent + self.frames_nulled + self.frames_deficit
+        return self.frames_nulled / expected * 100 if expected > 0 else 0.0
+
     def update(self, payload: typing.Dict[str, typing.Any]) -> None:
         self.active_players = typing.cast(int, payload["playingPlayers"])
         self.players = typing.cast(int, payload["players"])
@@ -42,3 +284,5 @@ class Stats:
             self.frames_sent = fs["sent"]
             self.frames_deficit = fs["deficit"]
             self.frames_nulled = fs["nulled"]
+
+        self.history.append(self)
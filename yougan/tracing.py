@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import logging
+import time
+import types
+import typing
+
+__all__: typing.Tuple[str, ...] = ("Span", "Observer", "OpenTelemetryObserver", "add_observer", "remove_observer")
+
+_LOGGER = logging.getLogger("yougan")
+
+observers: typing.List[Observer] = []
+"""Registered observers.
+
+Instrumented code checks this list before creating a span, so tracing costs a
+single truthiness check while no observer is registered.
+"""
+
+
+class Span:
+    """A timed operation reported to the observers.
+
+    Times are given by `time.monotonic_ns`.
+    """
+
+    __slots__ = ("name", "node", "guild_id", "attributes", "start_ns", "end_ns", "error", "data")
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        node: typing.Optional[str] = None,
+        guild_id: typing.Optional[int] = None,
+        attributes: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    ) -> None:
+        self.name = name
+        """Name of the operation, such as `yougan.search_tracks`."""
+
+        self.node = node
+        """Name of the node involved, if any."""
+
+        self.guild_id = guild_id
+        """Guild involved, if any."""
+
+        self.attributes = attributes or {}
+        """Extra details about the operation."""
+
+        self.start_ns = 0
+        self.end_ns = 0
+
+        self.error: typing.Optional[BaseException] = None
+        """The exception raised by the operation, if any."""
+
+        self.data: typing.Dict[typing.Any, typing.Any] = {}
+        """Storage for observers to keep their own state between `on_start` and `on_end`."""
+
+    @property
+    def duration_ns(self) -> int:
+        """Duration of the operation in nanoseconds."""
+        return self.end_ns - self.start_ns
+
+    def __enter__(self) -> Span:
+        self.start_ns = time.monotonic_ns()
+        for observer in observers:
+            try:
+                observer.on_start(self)
+            except Exception:
+                _LOGGER.exception("Observer %r failed on start of %s", observer, self.name)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: typing.Optional[typing.Type[BaseException]],
+        exc: typing.Optional[BaseException],
+        traceback: typing.Optional[types.TracebackType],
+    ) -> None:
+        self.end_ns = time.monotonic_ns()
+        self.error = exc
+        for observer in reversed(observers):
+            try:
+                observer.on_end(self)
+            except Exception:
+                _LOGGER.exception("Observer %r failed on end of %s", observer, self.name)
+
+    def __repr__(self) -> str:
+        return f"Span(name={self.name!r}, node={self.node!r}, guild_id={self.guild_id!r})"
+
+
+class Observer:
+    """Receives the spans of the instrumented operations.
+
+    Both callbacks run inline on the hot path and should return quickly.
+    """
+
+    def on_start(self, span: Span) -> None:
+        """Called when an operation starts."""
+
+    def on_end(self, span: Span) -> None:
+        """Called when an operation ends, with `Span.end_ns` and `Span.error` set."""
+
+
+def add_observer(observer: Observer) -> None:
+    """Register an observer for every instrumented operation."""
+    observers.append(observer)
+
+
+def remove_observer(observer: Observer) -> None:
+    """Unregister an observer."""
+    observers.remove(observer)
+
+
+class OpenTelemetryObserver(Observer):
+    """Forwards the spans to OpenTelemetry.
+
+    Spans are activated in the current context, so operations started inside
+    another one (such as the voice update sent by `Client.connect_to`) are
+    recorded as its children.
+
+    Parameters
+    ----------
+    tracer: typing.Optional[opentelemetry.trace.Tracer]
+        The tracer to create spans with. The global `yougan` tracer is used if not given.
+
+    Raises
+    ------
+    RuntimeError
+        If `opentelemetry-api` is not installed.
+    """
+
+    def __init__(self, tracer: typing.Any = None) -> None:
+        try:
+            from opentelemetry import context
+            from opentelemetry import trace
+        except ImportError:
+            raise RuntimeError("opentelemetry-api is required to use OpenTelemetryObserver") from None
+
+        self._context = context
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("yougan")
+
+    def on_start(self, span: Span) -> None:
+        attributes = {f"yougan.{key}": value for key, value in span.attributes.items()}
+        if span.node is not None:
+            attributes["yougan.node"] = span.node
+        if span.guild_id is not None:
+            attributes["yougan.guild_id"] = str(span.guild_id)
+
+        otel_span = self._tracer.start_span(span.name, attributes=attributes)
+        token = self._context.attach(self._trace.set_span_in_context(otel_span))
+        span.data[self] = (otel_span, token)
+
+    def on_end(self, span: Span) -> None:
+        otel_span, token = span.data.pop(self)
+        self._context.detach(token)
+        if span.error is not None:
+            otel_span.record_exception(span.error)
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(span.error)))
+        otel_span.end()